@@ -4,6 +4,7 @@ WBS BPKH AI - Authentication Module
 JWT-based authentication with role-based access control.
 """
 
+import time
 from datetime import datetime, timedelta
 from typing import Optional, List
 from enum import Enum
@@ -111,10 +112,14 @@ def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
     # bcrypt has 72 byte limit - truncate to be safe
     truncated_password = (password[:72] if password else "").encode('utf-8')
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     return bcrypt.hashpw(truncated_password, salt).decode('utf-8')
 
 
+# bcrypt checks above this are logged as slow (dominant cost of a login)
+SLOW_BCRYPT_MS = 500
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     try:
@@ -127,7 +132,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
             return False
 
         hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(truncated_password, hashed_bytes)
+        # Cost comes from the stored hash's own work factor, not BCRYPT_ROUNDS
+        start = time.perf_counter()
+        valid = bcrypt.checkpw(truncated_password, hashed_bytes)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > SLOW_BCRYPT_MS:
+            logger.warning(f"Slow bcrypt verify: {elapsed_ms:.0f} ms")
+        else:
+            logger.debug(f"bcrypt verify: {elapsed_ms:.0f} ms")
+        return valid
     except Exception as e:
         logger.error(f"Password verification error: {e}")
         return False
@@ -0,0 +1,28 @@
+"""
+WBS BPKH AI - Micro-batching
+============================
+Shared queue drain for the services that coalesce concurrent requests.
+"""
+
+import asyncio
+from typing import Any, List
+
+
+async def collect_batch(queue: asyncio.Queue, max_size: int, window: float) -> List[Any]:
+    """Wait for one queued item, then collect more for up to `window` seconds.
+
+    Returns as soon as max_size items are gathered or the window closes,
+    whichever comes first.
+    """
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + window
+    while len(batch) < max_size:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
@@ -29,6 +29,7 @@ class Settings(BaseSettings):
     embedding_model: str = Field(default="llama-3.3-70b-versatile", env="EMBEDDING_MODEL")
     max_tokens: int = Field(default=4096, env="MAX_TOKENS")
     temperature: float = Field(default=0.1, env="TEMPERATURE")
+    embedding_compile: bool = Field(default=False, env="EMBEDDING_COMPILE")  # torch.compile the local embedding model
     
     # Supabase
     supabase_url: str = Field(default="", env="SUPABASE_URL")
@@ -46,6 +47,7 @@ class Settings(BaseSettings):
     jwt_secret: str = Field(default="", env="JWT_SECRET")  # Must be set in production
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     jwt_expiry_minutes: int = Field(default=60, env="JWT_EXPIRY_MINUTES")  # 1 hour
+    bcrypt_rounds: int = Field(default=12, env="BCRYPT_ROUNDS")  # work factor for new hashes
     
     # Notification
     smtp_host: Optional[str] = Field(default=None, env="SMTP_HOST")
@@ -321,6 +323,19 @@ STATUS_LIFECYCLE = {
     "CLOSED_INVALID": []  # Final state
 }
 
+# Status labels shown to reporters (WhatsApp / email notifications)
+REPORTER_STATUS_LABELS = {
+    "NEW": "Diterima",
+    "REVIEWING": "Sedang Ditinjau",
+    "NEED_INFO": "Butuh Informasi Tambahan",
+    "INVESTIGATING": "Dalam Investigasi",
+    "HOLD": "Ditangguhkan",
+    "ESCALATED": "Dieskalasi",
+    "CLOSED_PROVEN": "Selesai - Terbukti",
+    "CLOSED_NOT_PROVEN": "Selesai - Tidak Terbukti",
+    "CLOSED_INVALID": "Ditutup - Tidak Valid"
+}
+
 
 # ============================================================================
 # ESCALATION MATRIX (Sesuai Business Process WBS BPKH v1.1)
@@ -5,6 +5,7 @@ Modular database repositories with shared Supabase client.
 """
 
 from .client import SupabaseDB
+from .buffer import BulkInsertBuffer
 from .utils import (
     sanitize_input, sanitize_list, sanitize_search_query,
     validate_field_length, parse_date_safe,
@@ -23,7 +24,7 @@ user_repo = UserRepository()
 session_repo = SessionRepository()
 
 __all__ = [
-    "SupabaseDB",
+    "SupabaseDB", "BulkInsertBuffer",
     "sanitize_input", "sanitize_list", "sanitize_search_query",
     "validate_field_length", "parse_date_safe", "MAX_FIELD_LENGTHS",
     "ReportRepository", "MessageRepository", "VectorRepository",
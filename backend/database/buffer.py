@@ -0,0 +1,95 @@
+"""
+WBS BPKH AI - Bulk Insert Buffer
+================================
+Coalesces single-row inserts into multi-row INSERTs.
+"""
+
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple
+from loguru import logger
+
+from batching import collect_batch
+
+
+class BulkInsertBuffer:
+    """Buffer rows for one table and insert them in batches.
+
+    Callers await enqueue() and get back their inserted row. A background
+    task flushes every flush_interval seconds or max_batch rows, whichever
+    comes first, as a single INSERT ... VALUES (...), (...) RETURNING *.
+    Rows must carry a unique "id" so results can be matched to callers.
+
+    Inserts are idempotent on "id" (ON CONFLICT DO NOTHING): if a batch
+    errors after the server committed it (e.g. a timeout), the row-by-row
+    retry skips rows already written instead of failing on duplicate ids.
+    """
+
+    def __init__(self, db, table: str, flush_interval: float = 0.1, max_batch: int = 50):
+        self.db = db
+        self.table = table
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def enqueue(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a row for insert and wait for the batch it lands in."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((record, future))
+        return await future
+
+    async def aclose(self, timeout: float = 10.0):
+        """Flush rows still queued (up to timeout), then stop the flusher."""
+        if self._flusher is None:
+            return
+        if not self._flusher.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Dropping {self._queue.qsize()} buffered {self.table} rows on shutdown")
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+
+    async def _flush_loop(self):
+        queue = self._queue
+        while True:
+            batch = await collect_batch(queue, self.max_batch, self.flush_interval)
+            await self._flush(batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        records = [record for record, _ in batch]
+        try:
+            result = await asyncio.to_thread(
+                self.db.table(self.table)
+                .upsert(records, on_conflict="id", ignore_duplicates=True)
+                .execute
+            )
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad row fails the whole statement: isolate it
+                logger.warning(f"Bulk insert into {self.table} failed, retrying row by row: {e}")
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.error(f"Insert into {self.table} failed: {e}")
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        inserted = {row.get("id"): row for row in (result.data or [])}
+        logger.debug(f"Bulk inserted {len(records)} rows into {self.table}")
+        for record, future in batch:
+            if not future.done():
+                future.set_result(inserted.get(record["id"], record))
@@ -9,6 +9,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from .client import SupabaseDB
+from .buffer import BulkInsertBuffer
 from .utils import sanitize_input, validate_field_length
 
 
@@ -18,6 +19,8 @@ class MessageRepository:
     def __init__(self):
         self.db = SupabaseDB.get_client()
         self.table = "messages"
+        # Shared by high-volume callers (webhooks); see create_buffered()
+        self.buffer = BulkInsertBuffer(self.db, self.table)
 
     async def create(
         self,
@@ -28,16 +31,7 @@ class MessageRepository:
         ticket_id: str = None,
     ) -> Dict[str, Any]:
         """Create new message."""
-        record = {
-            "id": str(uuid.uuid4()),
-            "report_id": report_id,
-            "ticket_id": ticket_id,
-            "content": sanitize_input(validate_field_length(content, "content")),
-            "sender_type": sender_type,
-            "has_attachments": bool(attachments),
-            "is_read": False,
-            "created_at": datetime.utcnow().isoformat(),
-        }
+        record = self._build_record(report_id, content, sender_type, attachments, ticket_id)
         result = self.db.table(self.table).insert(record).execute()
         created = result.data[0] if result.data else record
 
@@ -50,6 +44,41 @@ class MessageRepository:
 
         return created
 
+    async def aclose(self):
+        """Flush buffered message rows (app shutdown)."""
+        await self.buffer.aclose()
+
+    async def create_buffered(
+        self,
+        report_id: str,
+        content: str,
+        sender_type: str = "REPORTER",
+        ticket_id: str = None,
+    ) -> Dict[str, Any]:
+        """Create new message via the bulk insert buffer (no attachments)."""
+        return await self.buffer.enqueue(
+            self._build_record(report_id, content, sender_type, None, ticket_id)
+        )
+
+    @staticmethod
+    def _build_record(
+        report_id: str,
+        content: str,
+        sender_type: str,
+        attachments: Optional[List[str]],
+        ticket_id: Optional[str],
+    ) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "report_id": report_id,
+            "ticket_id": ticket_id,
+            "content": sanitize_input(validate_field_length(content, "content")),
+            "sender_type": sender_type,
+            "has_attachments": bool(attachments),
+            "is_read": False,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
     async def get_by_report(self, report_id: str) -> List[Dict[str, Any]]:
         """Get all messages for a report."""
         result = self.db.table(self.table)\
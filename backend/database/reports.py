@@ -12,6 +12,7 @@ from loguru import logger
 
 from config import SEVERITY_LEVELS
 from .client import SupabaseDB
+from .buffer import BulkInsertBuffer
 from .utils import (
     sanitize_input, sanitize_list, sanitize_search_query,
     validate_field_length, parse_date_safe,
@@ -24,6 +25,9 @@ class ReportRepository:
     def __init__(self):
         self.db = SupabaseDB.get_client()
         self.table = "reports"
+        # Shared by high-volume callers (webhooks); see create_buffered()
+        self.buffer = BulkInsertBuffer(self.db, self.table)
+        self.audit_buffer = BulkInsertBuffer(self.db, "audit_logs")
 
     def generate_ticket_id(self) -> str:
         """Generate unique 8-character ticket ID."""
@@ -31,9 +35,53 @@ class ReportRepository:
 
     async def create(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new report."""
+        record = self._build_record(report_data)
+
+        result = self.db.table(self.table).insert(record).execute()
+        logger.info(f"Created report with ticket_id: {record['ticket_id']}")
+
+        # Save attachments to attachments table
+        attachment_ids = report_data.get("attachments") or []
+        if attachment_ids:
+            await self._link_attachments(record["id"], attachment_ids)
+
+        await self._create_audit_log(
+            record["id"], "REPORT_CREATED",
+            {"ticket_id": record["ticket_id"], "channel": record["channel"]},
+        )
+
+        return result.data[0] if result.data else record
+
+    async def aclose(self):
+        """Flush buffered report and audit rows (app shutdown)."""
+        await self.buffer.aclose()
+        await self.audit_buffer.aclose()
+
+    async def create_buffered(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create new report via the bulk insert buffer.
+
+        Same result as create(), but the report and its audit entry are
+        inserted together with other reports queued in the same window.
+        Attachments are not supported on this path.
+        """
+        record = self._build_record(report_data)
+        created = await self.buffer.enqueue(record)
+        logger.info(f"Created report with ticket_id: {record['ticket_id']}")
+
+        try:
+            await self.audit_buffer.enqueue(self._audit_record(
+                record["id"], "REPORT_CREATED",
+                {"ticket_id": record["ticket_id"], "channel": record["channel"]},
+            ))
+        except Exception as e:
+            logger.error(f"Failed to create audit log: {e}")
+
+        return created
+
+    def _build_record(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
         ticket_id = self.generate_ticket_id()
 
-        record = {
+        return {
             "id": str(uuid.uuid4()),
             "ticket_id": ticket_id,
             "channel": report_data.get("channel", "WEB"),
@@ -53,21 +101,6 @@ class ReportRepository:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-        result = self.db.table(self.table).insert(record).execute()
-        logger.info(f"Created report with ticket_id: {ticket_id}")
-
-        # Save attachments to attachments table
-        attachment_ids = report_data.get("attachments") or []
-        if attachment_ids:
-            await self._link_attachments(record["id"], attachment_ids)
-
-        await self._create_audit_log(
-            record["id"], "REPORT_CREATED",
-            {"ticket_id": ticket_id, "channel": record["channel"]},
-        )
-
-        return result.data[0] if result.data else record
-
     async def get_by_ticket_id(self, ticket_id: str) -> Optional[Dict[str, Any]]:
         """Get report by ticket ID."""
         result = self.db.table(self.table)\
@@ -339,18 +372,24 @@ class ReportRepository:
     ):
         """Create audit trail entry."""
         try:
-            self.db.table("audit_logs").insert({
-                "id": str(uuid.uuid4()),
-                "entity_type": "report",
-                "entity_id": report_id,
-                "action": action,
-                "action_details": json.dumps(details) if isinstance(details, dict) else str(details),
-                "actor_type": details.get("actor_type", "SYSTEM") if isinstance(details, dict) else "SYSTEM",
-                "created_at": datetime.utcnow().isoformat(),
-            }).execute()
+            self.db.table("audit_logs").insert(
+                self._audit_record(report_id, action, details)
+            ).execute()
         except Exception as e:
             logger.error(f"Failed to create audit log: {e}")
 
+    @staticmethod
+    def _audit_record(report_id: str, action: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "entity_type": "report",
+            "entity_id": report_id,
+            "action": action,
+            "action_details": json.dumps(details) if isinstance(details, dict) else str(details),
+            "actor_type": details.get("actor_type", "SYSTEM") if isinstance(details, dict) else "SYSTEM",
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
     async def get_audit_logs(
         self,
         report_id: Optional[str] = None,
@@ -15,6 +15,9 @@ from .client import SupabaseDB
 class UserRepository:
     """Repository for User operations."""
 
+    # Columns returned by list_all (never password hashes or reset tokens)
+    LIST_COLUMNS = "id,email,full_name,role,status,department,last_login,created_at"
+
     def __init__(self):
         self.db = SupabaseDB.get_client()
         self.table = "users"
@@ -128,8 +131,8 @@ class UserRepository:
         limit: int = 50,
         offset: int = 0,
     ) -> List[Dict[str, Any]]:
-        """List all users with filters."""
-        query = self.db.table(self.table).select("*")
+        """List all users with filters (LIST_COLUMNS only)."""
+        query = self.db.table(self.table).select(self.LIST_COLUMNS)
         if role:
             query = query.eq("role", role)
         if status:
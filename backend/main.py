@@ -7,7 +7,7 @@ ISO 37002:2021 Compliant
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
 import logging
@@ -22,9 +22,12 @@ logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("groq").setLevel(logging.WARNING)
 
 from config import settings
-from database import report_repo
+from database import report_repo, message_repo
 from rag import RAGRetriever, KnowledgeLoader
 from agents import QuickAnalyzer
+from services.email_service import email_service
+from services.whatsapp_service import whatsapp_service
+from services.notification_service import notification_service
 from middleware import (
     SecurityHeadersMiddleware,
     RateLimiterMiddleware,
@@ -66,10 +69,18 @@ async def lifespan(app: FastAPI):
     app.state.rag_retriever = RAGRetriever()
     app.state.knowledge_loader = KnowledgeLoader()
     app.state.quick_analyzer = QuickAnalyzer()
+    notification_service.start()
+    whatsapp_service.warm_up()
 
     logger.info("Application started successfully")
     yield
     logger.info("Shutting down WBS BPKH AI...")
+    # Webhooks are acknowledged before their rows are written: flush first
+    await report_repo.aclose()
+    await message_repo.aclose()
+    await notification_service.aclose()
+    await email_service.aclose()
+    await whatsapp_service.aclose()
 
 
 # ============== FastAPI App ==============
@@ -88,6 +99,7 @@ app = FastAPI(
     ),
     version=settings.app_version,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=docs_url,
     redoc_url=redoc_url,
     openapi_url=openapi_url,
@@ -4,12 +4,21 @@ WBS BPKH AI - Pydantic Models
 Data models for API requests and responses.
 """
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, SkipValidation, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
 
+# Shared config for response models built from trusted DB/agent data
+RESPONSE_MODEL_CONFIG = ConfigDict(
+    extra="ignore",
+    populate_by_name=True,
+    from_attributes=True,
+    validate_assignment=False,
+)
+
+
 # ============== Enums ==============
 
 class ReportChannel(str, Enum):
@@ -127,23 +136,23 @@ class ReportResponse(BaseModel):
     created_at: str
     updated_at: str
 
-    class Config:
-        from_attributes = True
-        populate_by_name = True
+    model_config = RESPONSE_MODEL_CONFIG
 
 
 class ReportDetail(ReportResponse):
     """Detailed report model with analysis"""
-    ai_analysis: Optional[Dict[str, Any]] = None
+    ai_analysis: SkipValidation[Optional[Dict[str, Any]]] = None
     incident_date: Optional[str] = None
     incident_location: Optional[str] = None
     parties_involved: List[str] = []
     messages_count: int = 0
-    attachments: List[Dict[str, Any]] = []
+    attachments: SkipValidation[List[Dict[str, Any]]] = []
 
 
 class ReportListResponse(BaseModel):
     """Response for report list"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     total: int
     reports: List[ReportResponse]
     page: int
@@ -175,9 +184,8 @@ class MessageResponse(BaseModel):
     attachments: List[str] = []
     is_read: bool
     created_at: str
-    
-    class Config:
-        from_attributes = True
+
+    model_config = RESPONSE_MODEL_CONFIG
 
 
 # ============== Analysis Models ==============
@@ -247,6 +255,8 @@ class SummaryResult(BaseModel):
 
 class FullAnalysisResponse(BaseModel):
     """Complete analysis response"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     analysis_id: str
     analyzed_at: str
     status: str
@@ -257,23 +267,23 @@ class FullAnalysisResponse(BaseModel):
     fraud_score: Optional[float] = None
     priority: Optional[str] = None
     
-    # Agent results
-    intake: Optional[Dict[str, Any]] = None
-    fraud_analysis: Optional[Dict[str, Any]] = None
-    compliance: Optional[Dict[str, Any]] = None
-    severity_details: Optional[Dict[str, Any]] = None
-    recommendations: Optional[Dict[str, Any]] = None
-    executive_summary: Optional[Dict[str, Any]] = None
+    # Agent results (trusted agent output, not re-validated)
+    intake: SkipValidation[Optional[Dict[str, Any]]] = None
+    fraud_analysis: SkipValidation[Optional[Dict[str, Any]]] = None
+    compliance: SkipValidation[Optional[Dict[str, Any]]] = None
+    severity_details: SkipValidation[Optional[Dict[str, Any]]] = None
+    recommendations: SkipValidation[Optional[Dict[str, Any]]] = None
+    executive_summary: SkipValidation[Optional[Dict[str, Any]]] = None
 
     # Verification & Audit results
-    skill_verification: Optional[Dict[str, Any]] = None
-    audit: Optional[Dict[str, Any]] = None
+    skill_verification: SkipValidation[Optional[Dict[str, Any]]] = None
+    audit: SkipValidation[Optional[Dict[str, Any]]] = None
     grounding_score: Optional[float] = None
     consistency_score: Optional[float] = None
     bias_risk: Optional[str] = None
 
     # Metadata
-    similar_cases: List[Dict[str, Any]] = []
+    similar_cases: SkipValidation[List[Dict[str, Any]]] = []
     agents_used: List[str] = []
 
 
@@ -281,6 +291,8 @@ class FullAnalysisResponse(BaseModel):
 
 class DashboardStats(BaseModel):
     """Dashboard statistics"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     total_reports: int
     by_status: Dict[str, int]
     by_severity: Dict[str, int]
@@ -302,16 +314,27 @@ class StatusUpdate(BaseModel):
 
 class TicketLookup(BaseModel):
     """Ticket lookup request"""
+    model_config = ConfigDict(frozen=True)
+
     ticket_id: str = Field(
         ..., 
         min_length=8, 
         max_length=8,
+        pattern=r"^[A-Z0-9]{8}$",
         description="8-character ticket ID"
     )
 
+    @field_validator("ticket_id", mode="before")
+    @classmethod
+    def _upper_ticket_id(cls, value):
+        # Reporters may type the ticket in lower case; IDs are stored upper case
+        return value.upper() if isinstance(value, str) else value
+
 
 class TicketStatusResponse(BaseModel):
     """Public ticket status response (for whistleblowers)"""
+    model_config = ConfigDict(**RESPONSE_MODEL_CONFIG, frozen=True)
+
     ticket_id: str
     status: str
     status_description: str
@@ -323,7 +346,7 @@ class TicketStatusResponse(BaseModel):
     incident_date: Optional[str] = None
     incident_location: Optional[str] = None
     parties_involved: List[str] = []
-    attachments: List[Dict[str, Any]] = []
+    attachments: SkipValidation[List[Dict[str, Any]]] = []
     created_at: Optional[str] = None
     last_updated: str
     can_add_info: bool = True
@@ -4,12 +4,14 @@ WBS BPKH AI - RAG Module
 Retrieval Augmented Generation for regulation knowledge.
 """
 
-from .embeddings import EmbeddingService
+from .embeddings import Chunk, EmbeddingService, get_embedding_service
 from .retriever import RAGRetriever
 from .knowledge_loader import KnowledgeLoader
 
 __all__ = [
+    "Chunk",
     "EmbeddingService",
+    "get_embedding_service",
     "RAGRetriever",
     "KnowledgeLoader"
 ]
@@ -5,17 +5,22 @@ Text embeddings for RAG using sentence-transformers.
 Note: Groq free tier doesn't include embeddings, so we use local model.
 """
 
-from typing import List, Optional
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 from loguru import logger
 
-# Use sentence-transformers for embeddings (free, local)
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-    logger.warning("sentence-transformers not available, using fallback")
+from batching import collect_batch
+from config import settings
+
+# Sentence-ending punctuation followed by whitespace, for chunk boundaries
+_SENT_BOUNDARY = re.compile(r'[.!?][ \n]')
 
 
 class EmbeddingService:
@@ -26,98 +31,331 @@ class EmbeddingService:
     """
     
     _instance: Optional['EmbeddingService'] = None
+    _lock = threading.Lock()
     _model = None
+    _eager_auto_model = None
+    _initialized = False
     
     # Model selection - multilingual for Indonesian support
     MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     EMBEDDING_DIM = 384
     
+    # Micro-batching: concurrent embed_text calls are coalesced into one encode()
+    MAX_BATCH = 32
+    MAX_WAIT_MS = 10
+    
+    _queue: Optional[asyncio.Queue] = None
+    _consumer: Optional[asyncio.Task] = None
+    _in_flight = 0  # encodes started from the event loop and not yet finished
+    
+    # One forward pass at a time, whichever path (fast path, consumer,
+    # embed_batch) calls the model; reentrant for the eager fallback
+    _encode_lock = threading.RLock()
+    
+    # LRU cache of embed_text results, keyed by digest of model + text
+    CACHE_SIZE = 4096
+    _cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+    
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        if self._model is None:
-            self._initialize_model()
-    
     def _initialize_model(self):
-        """Initialize embedding model"""
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+        """
+        Initialize embedding model (blocking)
+        
+        sentence-transformers (and torch) are imported here rather than at
+        module import so the app can start before the model is needed.
+        Safe to call from several threads: the model is loaded only once.
+        """
+        if self._initialized:
+            return
+        with self._lock:
+            if not self._initialized:
+                self._load_model()
+    
+    def _load_model(self):
+        """Load the model; caller must hold _lock"""
+        try:
+            # Use sentence-transformers for embeddings (free, local)
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            self._model = None
+            logger.warning("sentence-transformers not available, using fallback hash-based embeddings")
+        else:
             try:
+                # Split CPU cores between uvicorn workers to avoid thread oversubscription
+                workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+                torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+                
                 self._model = SentenceTransformer(self.MODEL_NAME)
+                self._model.eval()
                 logger.info(f"Loaded embedding model: {self.MODEL_NAME}")
+                
+                if settings.embedding_compile and hasattr(torch, "compile"):
+                    self._compile_model(torch)
             except Exception as e:
                 logger.error(f"Failed to load model: {e}")
                 self._model = None
-        else:
-            self._model = None
-            logger.warning("Using fallback hash-based embeddings")
+        self._initialized = True
+    
+    async def embed_text(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for single text
+        
+        Results are memoized in an LRU cache. On a miss, concurrent callers
+        are micro-batched into a single model forward pass.
+        """
+        if self._model is None:
+            return self._fallback_embed(text)
+        
+        key = self._cache_key(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        
+        try:
+            embedding = await self._embed_with_model(text)
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return self._fallback_embed(text)
+        
+        self._cache_put(key, embedding)
+        return embedding
+    
+    def _cache_put(self, key: bytes, embedding: np.ndarray):
+        """Store a read-only embedding, evicting the least recently used entry"""
+        embedding.flags.writeable = False
+        self._cache[key] = embedding
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def _cache_key(self, text: str) -> bytes:
+        """Cache key: digest of model name + text (invalidated on model swap)"""
+        return hashlib.blake2b(
+            f"{self.MODEL_NAME}\0{text}".encode("utf-8"), digest_size=16
+        ).digest()
+    
+    async def _embed_with_model(self, text: str) -> np.ndarray:
+        """Encode one text, directly when idle or via the batching queue"""
+        loop = asyncio.get_running_loop()
+        
+        # Fast path: idle service, no need to wait for a batch window
+        if self._in_flight == 0 and (self._queue is None or self._queue.empty()):
+            self._in_flight += 1
+            try:
+                embeddings = await loop.run_in_executor(None, self._encode, [text])
+                return embeddings[0]
+            finally:
+                self._in_flight -= 1
+        
+        self._ensure_consumer()
+        future = loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    def _compile_model(self, torch):
+        """Swap the transformer for a torch.compile'd version (traced on first call)"""
+        transformer = self._model[0]
+        try:
+            compiled = torch.compile(
+                transformer.auto_model, mode="reduce-overhead", dynamic=True
+            )
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, using eager model: {e}")
+            return
+        self._eager_auto_model = transformer.auto_model
+        transformer.auto_model = compiled
+        logger.info("Embedding model compiled with torch.compile")
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the model forward pass for a list of texts (blocking)"""
+        import torch
+        
+        with self._encode_lock:
+            try:
+                with torch.inference_mode():
+                    embeddings = self._model.encode(
+                        texts,
+                        batch_size=self.MAX_BATCH,
+                        convert_to_numpy=True,
+                        normalize_embeddings=True
+                    )
+            except Exception as e:
+                if self._eager_auto_model is None:
+                    raise
+                # Compilation happens lazily on first call; fall back to eager for good
+                logger.warning(f"Compiled embedding model failed, reverting to eager: {e}")
+                self._model[0].auto_model = self._eager_auto_model
+                self._eager_auto_model = None
+                return self._encode(texts)
+        return embeddings.astype(np.float32, copy=False)
+    
+    def _ensure_consumer(self):
+        """Start the batching consumer on the running event loop"""
+        if self._consumer is None or self._consumer.done():
+            self._queue = asyncio.Queue()
+            self._consumer = asyncio.get_running_loop().create_task(
+                self._consume()
+            )
+    
+    async def _consume(self):
+        """Background consumer: encode queued texts in batches and fan out results"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = await collect_batch(self._queue, self.MAX_BATCH, self.MAX_WAIT_MS / 1000)
+            texts = [text for text, _ in batch]
+            
+            self._in_flight += 1
+            try:
+                embeddings = await loop.run_in_executor(None, self._encode, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._in_flight -= 1
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
     
-    def embed_text(self, text: str) -> List[float]:
-        """Generate embedding for single text"""
-        if self._model is not None:
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate L2-normalized embeddings as one (N, D) float32 array
+        
+        Texts already in the embed_text cache are not re-encoded; only the
+        misses go through the model, and their results are cached too.
+        """
+        if self._model is None:
+            return self._fallback_batch(texts)
+        
+        embeddings, misses = self._batch_lookup(texts)
+        if misses:
             try:
-                embedding = self._model.encode(text, convert_to_numpy=True)
-                return embedding.tolist()
+                encoded = self._encode([texts[pos[0]] for pos in misses.values()])
             except Exception as e:
-                logger.error(f"Embedding error: {e}")
-                return self._fallback_embed(text)
-        return self._fallback_embed(text)
+                logger.error(f"Batch embedding error: {e}")
+                return self._fallback_batch(texts)
+            self._batch_fill(embeddings, misses, encoded)
+        return embeddings
     
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for batch of texts"""
-        if self._model is not None:
+    async def embed_batch_async(self, texts: List[str]) -> np.ndarray:
+        """
+        embed_batch with the model forward pass run in a worker thread
+        
+        Cache lookups and updates stay on the event loop thread, so the
+        cache is never touched concurrently.
+        """
+        if self._model is None:
+            return self._fallback_batch(texts)
+        
+        embeddings, misses = self._batch_lookup(texts)
+        if misses:
+            loop = asyncio.get_running_loop()
             try:
-                embeddings = self._model.encode(texts, convert_to_numpy=True)
-                return embeddings.tolist()
+                encoded = await loop.run_in_executor(
+                    None, self._encode, [texts[pos[0]] for pos in misses.values()]
+                )
             except Exception as e:
                 logger.error(f"Batch embedding error: {e}")
-                return [self._fallback_embed(t) for t in texts]
-        return [self._fallback_embed(t) for t in texts]
+                return self._fallback_batch(texts)
+            self._batch_fill(embeddings, misses, encoded)
+        return embeddings
+    
+    def _batch_lookup(self, texts: List[str]) -> Tuple[np.ndarray, Dict[bytes, List[int]]]:
+        """Fill cached rows; return the output array and uncached key -> positions"""
+        embeddings = np.empty((len(texts), self.EMBEDDING_DIM), dtype=np.float32)
+        misses: Dict[bytes, List[int]] = {}
+        for i, text in enumerate(texts):
+            key = self._cache_key(text)
+            cached = self._cache.get(key)
+            if cached is None:
+                misses.setdefault(key, []).append(i)
+            else:
+                self._cache.move_to_end(key)
+                embeddings[i] = cached
+        return embeddings, misses
+    
+    def _batch_fill(
+        self,
+        embeddings: np.ndarray,
+        misses: Dict[bytes, List[int]],
+        encoded: np.ndarray
+    ):
+        """Scatter freshly encoded rows (one per miss) and cache them"""
+        for (key, positions), row in zip(misses.items(), encoded):
+            embeddings[positions] = row
+            self._cache_put(key, row.copy())
+    
+    def _fallback_batch(self, texts: List[str]) -> np.ndarray:
+        """Fallback embeddings for a batch of texts"""
+        if not texts:
+            return np.empty((0, self.EMBEDDING_DIM), dtype=np.float32)
+        return np.vstack([self._fallback_embed(t) for t in texts])
     
-    def _fallback_embed(self, text: str) -> List[float]:
+    def _fallback_embed(self, text: str) -> np.ndarray:
         """
         Fallback embedding using hash-based approach
         Not ideal for semantic search but works as placeholder
         """
-        # Simple hash-based embedding (for demo purposes)
-        np.random.seed(hash(text) % (2**32))
-        return np.random.randn(self.EMBEDDING_DIM).tolist()
+        # Expand a SHAKE-128 digest into EMBEDDING_DIM int16 values, L2-normalized;
+        # deterministic across processes and no global RNG state
+        buf = hashlib.shake_128(text.encode("utf-8")).digest(self.EMBEDDING_DIM * 2)
+        embedding = np.frombuffer(buf, dtype=np.int16).astype(np.float32)
+        embedding /= np.linalg.norm(embedding) or 1.0
+        return embedding
     
     def cosine_similarity(
         self,
-        embedding1: List[float],
-        embedding2: List[float]
+        embedding1: np.ndarray,
+        embedding2: np.ndarray
     ) -> float:
-        """Calculate cosine similarity between two embeddings"""
-        a = np.array(embedding1)
-        b = np.array(embedding2)
-        
-        dot_product = np.dot(a, b)
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
+        """
+        Calculate cosine similarity between two embeddings
         
-        if norm_a == 0 or norm_b == 0:
+        Embeddings from this service are already unit length, but callers
+        may pass any vectors, so the norms are still divided out.
+        """
+        norms = np.linalg.norm(embedding1) * np.linalg.norm(embedding2)
+        if norms == 0:
             return 0.0
-        
-        return float(dot_product / (norm_a * norm_b))
+        return float(np.dot(embedding1, embedding2) / norms)
+    
+    @staticmethod
+    def _quantize(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Symmetric int8 quantization with one scale per row"""
+        scales = np.abs(matrix).max(axis=-1, keepdims=True) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(matrix / scales).astype(np.int8)
+        return quantized, scales.reshape(-1).astype(np.float32)
     
     def find_most_similar(
         self,
-        query_embedding: List[float],
-        corpus_embeddings: List[List[float]],
+        query_embedding: np.ndarray,
+        corpus_embeddings: np.ndarray,
         top_k: int = 5
     ) -> List[tuple]:
-        """Find most similar embeddings from corpus"""
-        similarities = []
-        for i, emb in enumerate(corpus_embeddings):
-            sim = self.cosine_similarity(query_embedding, emb)
-            similarities.append((i, sim))
-        
-        # Sort by similarity descending
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        """Find most similar embeddings from corpus as (row index, similarity) tuples"""
+        corpus = np.array(corpus_embeddings, dtype=np.float32, ndmin=2)
+        if top_k <= 0 or corpus.size == 0:
+            return []
+        
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(corpus, axis=1) * np.linalg.norm(q)
+        sims = np.divide(corpus @ q, norms, out=np.zeros(len(corpus), dtype=np.float32), where=norms != 0)
+        
+        top_k = min(top_k, len(sims))
+        idx = np.argpartition(-sims, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-sims[idx])]
+        return [(int(i), float(sims[i])) for i in idx]
 
 
 class ChunkingService:
@@ -132,60 +370,91 @@ class ChunkingService:
         self.chunk_overlap = chunk_overlap
     
     def chunk_text(self, text: str) -> List[str]:
-        """Split text into overlapping chunks"""
-        if len(text) <= self.chunk_size:
+        """
+        Split text into overlapping chunks
+        
+        Boundaries are tracked as (start, end) index spans and each chunk
+        is sliced out of the text exactly once at the end.
+        """
+        text_len = len(text)
+        if text_len <= self.chunk_size:
             return [text]
         
-        chunks = []
+        spans = []
         start = 0
         
-        while start < len(text):
+        while start < text_len:
             end = start + self.chunk_size
             
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Look for sentence ending punctuation
-                for punct in ['. ', '.\n', '! ', '? ']:
-                    last_punct = text[start:end].rfind(punct)
-                    if last_punct > self.chunk_size // 2:
-                        end = start + last_punct + len(punct)
-                        break
+            # Try to break at the last sentence boundary in the second half
+            if end < text_len:
+                last_match = None
+                for last_match in _SENT_BOUNDARY.finditer(
+                    text, start + self.chunk_size // 2 + 1, end
+                ):
+                    pass
+                if last_match is not None:
+                    end = last_match.end()
             
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+            # Trim surrounding whitespace by index instead of .strip()
+            chunk_start, chunk_end = start, min(end, text_len)
+            while chunk_start < chunk_end and text[chunk_start].isspace():
+                chunk_start += 1
+            while chunk_end > chunk_start and text[chunk_end - 1].isspace():
+                chunk_end -= 1
+            if chunk_start < chunk_end:
+                spans.append((chunk_start, chunk_end))
             
             start = end - self.chunk_overlap
             
             # Prevent infinite loop
-            if start >= len(text):
+            if start >= text_len:
                 break
         
-        return chunks
+        return [text[s:e] for s, e in spans]
     
     def chunk_with_metadata(
         self,
         text: str,
         source: str,
         doc_type: str
-    ) -> List[dict]:
+    ) -> List["Chunk"]:
         """Chunk text with metadata for each chunk"""
         chunks = self.chunk_text(text)
+        total = len(chunks)
         
         return [
-            {
-                "content": chunk,
-                "metadata": {
-                    "source": source,
-                    "doc_type": doc_type,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
-                }
-            }
+            Chunk(chunk, source, doc_type, i, total)
             for i, chunk in enumerate(chunks)
         ]
 
 
+@dataclass(slots=True, frozen=True)
+class Chunk:
+    """A chunk of a document with its position metadata"""
+    content: str
+    source: str
+    doc_type: str
+    chunk_index: int
+    total_chunks: int
+    
+    def as_metadata(self) -> Dict[str, Any]:
+        """Metadata dict as stored alongside the vector"""
+        return {
+            "source": self.source,
+            "doc_type": self.doc_type,
+            "chunk_index": self.chunk_index,
+            "total_chunks": self.total_chunks
+        }
+
+
+async def get_embedding_service() -> EmbeddingService:
+    """Get the embedding service, loading the model on first use"""
+    service = EmbeddingService()
+    if not service._initialized:
+        await asyncio.to_thread(service._initialize_model)
+    return service
+
+
 # Export singleton instance
-embedding_service = EmbeddingService()
 chunking_service = ChunkingService()
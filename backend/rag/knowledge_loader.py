@@ -4,9 +4,11 @@ WBS BPKH AI - Knowledge Loader
 Loads regulations and policies into knowledge base.
 """
 
-from typing import Dict, List, Any
+import asyncio
+from typing import Dict, List, Any, Tuple
 from loguru import logger
 
+from .embeddings import Chunk, chunking_service, get_embedding_service
 from .retriever import knowledge_indexer
 
 
@@ -220,23 +222,44 @@ AKUNTABILITAS:
     }
     
     async def load_all(self) -> Dict[str, int]:
-        """Load all built-in regulations into knowledge base"""
-        results = {}
+        """Load all built-in regulations into knowledge base in one batch"""
+        chunks: List[Chunk] = []
+        metadata: List[Dict[str, Any]] = []
+        spans: Dict[str, Tuple[int, int]] = {}
         
-        for key, regulation in self.REGULATIONS.items():
-            try:
-                count = await knowledge_indexer.index_regulation(
-                    regulation_name=regulation["name"],
-                    regulation_text=regulation["content"],
-                    articles=regulation["articles"]
+        # Gather regulation and article chunks from every regulation
+        for key, reg in self.REGULATIONS.items():
+            reg_chunks, reg_meta = knowledge_indexer.regulation_chunks(
+                reg["name"], reg["content"], reg["articles"],
+                chunks=_PRECOMPUTED_CHUNKS[key]
+            )
+            spans[key] = (len(chunks), len(chunks) + len(reg_chunks))
+            chunks.extend(reg_chunks)
+            metadata.extend(reg_meta)
+        
+        # One embedding pass for the whole corpus, then concurrent inserts
+        # per regulation so each count reflects only the batches that landed
+        try:
+            embedding_service = await get_embedding_service()
+            embeddings = await embedding_service.embed_batch_async([c.content for c in chunks])
+            counts = await asyncio.gather(*(
+                knowledge_indexer.bulk_index(
+                    chunks[start:stop], embeddings[start:stop], metadata[start:stop]
                 )
-                results[key] = count
-                logger.info(f"Loaded {key}: {count} chunks")
-            except Exception as e:
-                logger.error(f"Failed to load {key}: {e}")
-                results[key] = 0
+                for start, stop in spans.values()
+            ))
+        except Exception as e:
+            logger.error(f"Failed to load regulations: {e}")
+            return {key: 0 for key in spans}
         
-        return results
+        per_key = dict(zip(spans, counts))
+        for key, count in per_key.items():
+            expected = spans[key][1] - spans[key][0]
+            if count < expected:
+                logger.warning(f"Loaded {key}: {count} of {expected} chunks")
+            else:
+                logger.info(f"Loaded {key}: {count} chunks")
+        return per_key
     
     async def load_custom_document(
         self,
@@ -263,5 +286,14 @@ AKUNTABILITAS:
         return list(self.REGULATIONS.keys())
 
 
+# Built-in regulations are static, so chunk them once at import
+_PRECOMPUTED_CHUNKS: Dict[str, List[Chunk]] = {
+    key: chunking_service.chunk_with_metadata(
+        reg["content"], reg["name"], "REGULATION"
+    )
+    for key, reg in KnowledgeLoader.REGULATIONS.items()
+}
+
+
 # Export instance
 knowledge_loader = KnowledgeLoader()
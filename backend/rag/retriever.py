@@ -4,13 +4,165 @@ WBS BPKH AI - RAG Retriever
 Retrieves relevant context from knowledge base.
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import re
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import orjson
 from loguru import logger
 
-from .embeddings import embedding_service, chunking_service
+from .embeddings import Chunk, EmbeddingService, get_embedding_service, chunking_service
 from database import SupabaseDB
 
 
+# Built-in context used when the knowledge base has no relevant match
+_DEFAULT_CONTEXT = """
+KONTEKS REGULASI WHISTLEBLOWING BPKH:
+
+1. DASAR HUKUM:
+   - UU 31/1999 jo UU 20/2001 tentang Pemberantasan Tindak Pidana Korupsi
+   - UU 28/1999 tentang Penyelenggaraan Negara yang Bersih dan Bebas KKN
+   - PP 43/2018 tentang Tata Cara Pelaksanaan Peran Serta Masyarakat
+   - PP 71/2000 tentang Tata Cara Pemberian Penghargaan
+
+2. KATEGORI PELANGGARAN:
+   - Korupsi dan Suap
+   - Gratifikasi
+   - Fraud/Kecurangan
+   - Benturan Kepentingan
+   - Pelanggaran Pengadaan
+   - Penyalahgunaan Wewenang
+   - Pelanggaran Data Pribadi
+   - Pelanggaran Etika dan Disiplin
+
+3. PERLINDUNGAN PELAPOR (ISO 37002):
+   - Kerahasiaan identitas
+   - Perlindungan dari pembalasan
+   - Hak mendapat informasi perkembangan
+   - Komunikasi dua arah yang aman
+
+4. PRINSIP PENANGANAN:
+   - Independensi dan objektivitas
+   - Kerahasiaan dan keamanan
+   - Profesionalisme dan akuntabilitas
+   - Proporsionalitas tindakan
+""".strip()
+
+# Queries shorter than this retrieve poorly; they get the default context
+# without running the model or the vector search
+MIN_QUERY_CHARS = 20
+MIN_QUERY_WORDS = 4
+
+# Queries citing a regulation ("PP 43/2018", "Pasal 5") try keyword search
+# first; a top hit with at least this normalized rank skips the vector search
+_CITATION_RE = re.compile(r"\b(?:UU|PP|Pasal)\s+\d+", re.IGNORECASE)
+KEYWORD_MIN_RANK = 0.1
+
+
+class _SimLRUCache:
+    """
+    Similarity-keyed LRU cache of retrieved contexts
+    
+    A lookup hits when a cached query embedding has cosine similarity
+    >= threshold with the new one, so paraphrased queries reuse the
+    context of an earlier search. Keys are unit vectors (as returned by
+    embed_text), so cosine similarity is a single matrix-vector product.
+    They are stored as int8 with a per-row scale, like the corpus index;
+    quantization noise is far below the gap a 0.86 threshold has to resolve.
+    """
+    
+    def __init__(self, capacity: int = 1024, threshold: float = 0.86):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._keys = np.zeros((capacity, EmbeddingService.EMBEDDING_DIM), dtype=np.int8)
+        self._scales = np.zeros(capacity, dtype=np.float32)
+        self._values: List[Optional[str]] = [None] * capacity
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # slot -> None, oldest first
+    
+    def get(self, query: np.ndarray) -> Optional[str]:
+        """Return the context of the most similar cached query, if close enough"""
+        if not self._lru:
+            return None
+        slots = np.fromiter(self._lru, dtype=np.intp, count=len(self._lru))
+        q_int8, q_scale = EmbeddingService._quantize(query[np.newaxis, :])
+        # int32 accumulation: int8 products overflow int16
+        dots = self._keys[slots].astype(np.int32) @ q_int8[0].astype(np.int32)
+        sims = dots * (self._scales[slots] * q_scale[0])
+        best = int(sims.argmax())
+        if sims[best] < self.threshold:
+            return None
+        slot = int(slots[best])
+        self._lru.move_to_end(slot)
+        return self._values[slot]
+    
+    def put(self, query: np.ndarray, context: str):
+        """Store a context, evicting the least recently used entry when full"""
+        if len(self._lru) < self.capacity:
+            slot = len(self._lru)
+        else:
+            slot, _ = self._lru.popitem(last=False)
+        q_int8, q_scale = EmbeddingService._quantize(query[np.newaxis, :])
+        self._keys[slot] = q_int8[0]
+        self._scales[slot] = q_scale[0]
+        self._values[slot] = context
+        self._lru[slot] = None
+    
+    def clear(self):
+        self._lru.clear()
+        self._values = [None] * self.capacity
+
+
+# Context caches per search scope (top_k, threshold, doc_types); shared by
+# all RAGRetriever instances and cleared whenever the knowledge base changes.
+# Scopes are LRU-bounded: each cache preallocates its key matrix
+MAX_CONTEXT_SCOPES = 16
+_context_caches: "OrderedDict[Tuple[Any, ...], _SimLRUCache]" = OrderedDict()
+
+
+def _context_cache(scope: Tuple[Any, ...]) -> _SimLRUCache:
+    """Get or create the cache for a scope, evicting the least recently used scope"""
+    cache = _context_caches.get(scope)
+    if cache is None:
+        cache = _context_caches[scope] = _SimLRUCache()
+        if len(_context_caches) > MAX_CONTEXT_SCOPES:
+            _context_caches.popitem(last=False)
+    else:
+        _context_caches.move_to_end(scope)
+    return cache
+
+
+def clear_context_cache():
+    """Drop all cached contexts (call after the knowledge base changes)"""
+    _context_caches.clear()
+
+
+# Cap on blocking Supabase calls in flight from this process. Waiters queue
+# on the event loop, not in worker threads, so excess queries don't tie up
+# the default executor shared with embedding, SMTP and the agents
+MAX_CONCURRENT_QUERIES = 8
+_query_slots: Optional[asyncio.Semaphore] = None
+
+
+async def _execute(query):
+    """Run a blocking Supabase query builder's execute() in a worker thread"""
+    global _query_slots
+    if _query_slots is None:
+        _query_slots = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+    async with _query_slots:
+        return await asyncio.to_thread(query.execute)
+
+
+def _to_pgvector(embedding: np.ndarray) -> str:
+    """Format an embedding as a pgvector text literal ("[x,y,...]")"""
+    # orjson writes a float32 array as a JSON list in C (shortest round-trip
+    # digits), which is exactly pgvector's text format
+    return orjson.dumps(
+        np.ascontiguousarray(embedding, dtype=np.float32),
+        option=orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
 class RAGRetriever:
     """
     RAG Retriever - Retrieves relevant context for analysis
@@ -22,7 +174,6 @@ class RAGRetriever:
     """
     
     def __init__(self):
-        self.embedding_service = embedding_service
         self.db = SupabaseDB.get_client()
     
     async def retrieve_context(
@@ -44,9 +195,30 @@ class RAGRetriever:
         Returns:
             Combined context string
         """
+        # Retrieval disabled (top_k <= 0) or unreachable (cosine never exceeds 1)
+        if top_k <= 0 or threshold >= 1.0:
+            return _DEFAULT_CONTEXT
+        
+        stripped = query.strip()
+        if len(stripped) < MIN_QUERY_CHARS or len(stripped.split()) < MIN_QUERY_WORDS:
+            return _DEFAULT_CONTEXT
+        
         try:
+            # Regulation citations: exact keyword hits beat dense retrieval
+            if _CITATION_RE.search(query):
+                results = await self._keyword_search(query, top_k, doc_types)
+                if results and results[0].get("rank", 0) >= KEYWORD_MIN_RANK:
+                    return self._join_context(results)
+            
             # Generate query embedding
-            query_embedding = self.embedding_service.embed_text(query)
+            embedding_service = await get_embedding_service()
+            query_embedding = await embedding_service.embed_text(query)
+            
+            # Reuse the context of a near-identical earlier query
+            cache = _context_cache((top_k, threshold, tuple(doc_types or ())))
+            cached = cache.get(query_embedding)
+            if cached is not None:
+                return cached
             
             # Search using Supabase RPC (pgvector)
             results = await self._vector_search(
@@ -58,24 +230,45 @@ class RAGRetriever:
             
             if not results:
                 logger.info("No relevant context found, using built-in knowledge")
-                return self._get_default_context()
+                return _DEFAULT_CONTEXT
             
-            # Combine results into context string
-            context_parts = []
-            for result in results:
-                source = result.get("metadata", {}).get("source", "Unknown")
-                content = result.get("content", "")
-                context_parts.append(f"[Sumber: {source}]\n{content}")
-            
-            return "\n\n---\n\n".join(context_parts)
+            context = self._join_context(results)
+            cache.put(query_embedding, context)
+            return context
             
         except Exception as e:
             logger.error(f"RAG retrieval error: {e}")
-            return self._get_default_context()
+            return _DEFAULT_CONTEXT
+    
+    @staticmethod
+    def _join_context(results: List[Dict[str, Any]]) -> str:
+        """Combine results into one context string"""
+        # match_documents(_text) return display_content, which already
+        # carries the "[Sumber: ...]" header
+        return "\n\n---\n\n".join(r.get("content") or "" for r in results)
+    
+    async def _keyword_search(
+        self,
+        query: str,
+        top_k: int,
+        doc_types: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """Perform full-text search in Supabase, best rank first"""
+        try:
+            params = {"query_text": query, "match_count": top_k}
+            if doc_types:
+                params["filter_doc_type"] = doc_types[0]
+            
+            result = await _execute(self.db.rpc("match_documents_text", params))
+            return result.data or []
+        
+        except Exception as e:
+            logger.error(f"Keyword search error: {e}")
+            return []
     
     async def _vector_search(
         self,
-        embedding: List[float],
+        embedding: np.ndarray,
         top_k: int,
         threshold: float,
         doc_types: Optional[List[str]]
@@ -85,14 +278,14 @@ class RAGRetriever:
             # Call Supabase RPC function for similarity search
             # SQL function params: query_embedding, match_count, filter_doc_type (singular)
             params = {
-                "query_embedding": embedding,
+                "query_embedding": _to_pgvector(embedding),
                 "match_count": top_k
             }
 
             if doc_types and len(doc_types) > 0:
                 params["filter_doc_type"] = doc_types[0]
 
-            result = self.db.rpc("match_documents", params).execute()
+            result = await _execute(self.db.rpc("match_documents", params))
             results = result.data or []
 
             # Client-side threshold filtering (SQL function doesn't support match_threshold)
@@ -111,65 +304,38 @@ class RAGRetriever:
         top_k: int = 3
     ) -> List[Dict[str, Any]]:
         """Retrieve similar historical cases"""
+        if top_k <= 0:
+            return []
+        
         try:
             # Generate embedding for report summary
-            embedding = self.embedding_service.embed_text(report_summary)
+            embedding_service = await get_embedding_service()
+            embedding = await embedding_service.embed_text(report_summary)
             
             # Search case history
-            result = self.db.rpc(
+            result = await _execute(self.db.rpc(
                 "match_cases",
                 {
-                    "query_embedding": embedding,
+                    "query_embedding": _to_pgvector(embedding),
                     "match_count": top_k
                 }
-            ).execute()
+            ))
             
             return result.data or []
             
         except Exception as e:
             logger.error(f"Similar cases retrieval error: {e}")
             return []
-    
-    def _get_default_context(self) -> str:
-        """Return default built-in context"""
-        return """
-KONTEKS REGULASI WHISTLEBLOWING BPKH:
-
-1. DASAR HUKUM:
-   - UU 31/1999 jo UU 20/2001 tentang Pemberantasan Tindak Pidana Korupsi
-   - UU 28/1999 tentang Penyelenggaraan Negara yang Bersih dan Bebas KKN
-   - PP 43/2018 tentang Tata Cara Pelaksanaan Peran Serta Masyarakat
-   - PP 71/2000 tentang Tata Cara Pemberian Penghargaan
-
-2. KATEGORI PELANGGARAN:
-   - Korupsi dan Suap
-   - Gratifikasi
-   - Fraud/Kecurangan
-   - Benturan Kepentingan
-   - Pelanggaran Pengadaan
-   - Penyalahgunaan Wewenang
-   - Pelanggaran Data Pribadi
-   - Pelanggaran Etika dan Disiplin
-
-3. PERLINDUNGAN PELAPOR (ISO 37002):
-   - Kerahasiaan identitas
-   - Perlindungan dari pembalasan
-   - Hak mendapat informasi perkembangan
-   - Komunikasi dua arah yang aman
-
-4. PRINSIP PENANGANAN:
-   - Independensi dan objektivitas
-   - Kerahasiaan dan keamanan
-   - Profesionalisme dan akuntabilitas
-   - Proporsionalitas tindakan
-"""
 
 
 class KnowledgeIndexer:
     """Index documents into vector store"""
     
+    # Records per insert request, and insert requests in flight at once
+    INSERT_BATCH_SIZE = 100
+    MAX_CONCURRENT_INSERTS = 4
+    
     def __init__(self):
-        self.embedding_service = embedding_service
         self.chunking_service = chunking_service
         self.db = SupabaseDB.get_client()
     
@@ -178,75 +344,149 @@ class KnowledgeIndexer:
         content: str,
         source: str,
         doc_type: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        chunks: Optional[List[Chunk]] = None
     ) -> int:
         """
         Index a document into the knowledge base
         
+        Args:
+            chunks: Pre-computed chunks of content (skips chunking)
+        
         Returns:
             Number of chunks indexed
         """
         # Chunk the document
-        chunks = self.chunking_service.chunk_with_metadata(
-            content, source, doc_type
-        )
+        if chunks is None:
+            chunks = self.chunking_service.chunk_with_metadata(
+                content, source, doc_type
+            )
         
         # Generate embeddings
-        texts = [c["content"] for c in chunks]
-        embeddings = self.embedding_service.embed_batch(texts)
+        embedding_service = await get_embedding_service()
+        embeddings = await embedding_service.embed_batch_async([c.content for c in chunks])
+        
+        count = await self.bulk_index(
+            chunks, embeddings, [metadata or {}] * len(chunks)
+        )
+        if count:
+            logger.info(f"Indexed {count} chunks from {source}")
+        return count
+    
+    async def bulk_index(
+        self,
+        chunks: List[Chunk],
+        embeddings: np.ndarray,
+        metadata: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Store already-embedded chunks in batched, concurrent inserts
+        
+        Args:
+            chunks: Chunks to store
+            embeddings: One row per chunk, as returned by embed_batch
+            metadata: Optional extra metadata per chunk
+        
+        Returns:
+            Number of chunks indexed
+        """
+        if not chunks:
+            return 0
         
-        # Store in Supabase
         records = []
-        for chunk, embedding in zip(chunks, embeddings):
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            # as_metadata() returns a fresh dict: extend it in place
+            chunk_meta = chunk.as_metadata()
+            if metadata and metadata[i]:
+                chunk_meta.update(metadata[i])
             record = {
-                "content": chunk["content"],
-                "embedding": embedding,
-                "metadata": {
-                    **chunk["metadata"],
-                    **(metadata or {})
-                }
+                "content": chunk.content,
+                "display_content": f"[Sumber: {chunk.source}]\n{chunk.content}",
+                "embedding": _to_pgvector(embedding),
+                "metadata": chunk_meta
             }
             records.append(record)
         
-        # Batch insert
-        try:
-            self.db.table("knowledge_vectors").insert(records).execute()
-            logger.info(f"Indexed {len(records)} chunks from {source}")
-            return len(records)
-        except Exception as e:
-            logger.error(f"Indexing error: {e}")
-            return 0
+        # Insert in fixed-size batches so large documents don't produce
+        # multi-MB request bodies; a failed batch doesn't sink the others
+        batch_size = self.INSERT_BATCH_SIZE
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_INSERTS)
+        
+        async def _insert(start: int) -> int:
+            batch = records[start:start + batch_size]
+            query = self.db.table("knowledge_vectors").insert(batch)
+            async with semaphore:
+                try:
+                    await _execute(query)
+                except Exception as e:
+                    logger.error(f"Indexing error: {e}")
+                    return 0
+            return len(batch)
+        
+        indexed = sum(await asyncio.gather(
+            *[_insert(start) for start in range(0, len(records), batch_size)]
+        ))
+        
+        if indexed:
+            clear_context_cache()
+        return indexed
     
     async def index_regulation(
         self,
         regulation_name: str,
         regulation_text: str,
-        articles: List[Dict[str, str]]
+        articles: List[Dict[str, str]],
+        chunks: Optional[List[Chunk]] = None
     ) -> int:
-        """Index a regulation with its articles"""
-        total_indexed = 0
-        
-        # Index full regulation
-        total_indexed += await self.index_document(
-            content=regulation_text,
-            source=regulation_name,
-            doc_type="REGULATION",
-            metadata={"regulation": regulation_name}
+        """Index a regulation with its articles in one embedding pass and one insert"""
+        all_chunks, metadata = self.regulation_chunks(
+            regulation_name, regulation_text, articles, chunks
         )
         
-        # Index individual articles
+        embedding_service = await get_embedding_service()
+        embeddings = await embedding_service.embed_batch_async([c.content for c in all_chunks])
+        
+        count = await self.bulk_index(all_chunks, embeddings, metadata)
+        if count:
+            logger.info(f"Indexed {count} chunks from {regulation_name}")
+        return count
+    
+    def regulation_chunks(
+        self,
+        regulation_name: str,
+        regulation_text: str,
+        articles: List[Dict[str, str]],
+        chunks: Optional[List[Chunk]] = None
+    ) -> Tuple[List[Chunk], List[Dict[str, Any]]]:
+        """
+        Chunk a regulation and its articles
+        
+        Args:
+            chunks: Pre-computed chunks of regulation_text (skips chunking)
+        
+        Returns:
+            (chunks, per-chunk metadata), full regulation first then articles
+        """
+        if chunks is None:
+            chunks = self.chunking_service.chunk_with_metadata(
+                regulation_text, regulation_name, "REGULATION"
+            )
+        all_chunks = list(chunks)
+        metadata: List[Dict[str, Any]] = [{"regulation": regulation_name}] * len(all_chunks)
+        
         for article in articles:
-            total_indexed += await self.index_document(
-                content=f"Pasal {article['number']}: {article['content']}",
-                source=f"{regulation_name} - Pasal {article['number']}",
-                doc_type="ARTICLE",
-                metadata={
-                    "regulation": regulation_name,
-                    "article_number": article["number"]
-                }
+            article_chunks = self.chunking_service.chunk_with_metadata(
+                f"Pasal {article['number']}: {article['content']}",
+                f"{regulation_name} - Pasal {article['number']}",
+                "ARTICLE"
+            )
+            all_chunks.extend(article_chunks)
+            metadata.extend(
+                [{"regulation": regulation_name, "article_number": article["number"]}]
+                * len(article_chunks)
             )
         
-        return total_indexed
+        return all_chunks, metadata
 
 
 # Export instances
@@ -4,6 +4,7 @@ Jalankan: python reset_admin.py
 """
 import os
 import sys
+import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import bcrypt
@@ -13,13 +14,17 @@ from supabase import create_client
 from dotenv import load_dotenv
 load_dotenv()
 
-# Generate new hash
+# Generate new hash (same work factor as the app, default 12)
 new_password = "Admin123!"
 truncated = new_password[:72].encode('utf-8')
-new_hash = bcrypt.hashpw(truncated, bcrypt.gensalt(rounds=12)).decode('utf-8')
+rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))
+start = time.perf_counter()
+new_hash = bcrypt.hashpw(truncated, bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+elapsed_ms = (time.perf_counter() - start) * 1000
 
 print(f"New password: {new_password}")
 print(f"New hash: {new_hash}")
+print(f"bcrypt rounds={rounds}: {elapsed_ms:.0f} ms")
 
 # Connect to Supabase
 url = os.getenv("SUPABASE_URL")
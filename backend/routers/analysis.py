@@ -5,6 +5,7 @@ AI analysis trigger and results endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from config import GENERIC_ERROR_MESSAGE
@@ -43,7 +44,10 @@ async def run_analysis(
             analysis = await quick_analyzer.quick_analyze(report["description"])
 
         await report_repo.update_analysis(request.report_id, analysis)
-        return FullAnalysisResponse(**analysis)
+        # Validated: the quick-analysis path lacks required fields (agent
+        # sub-results are SkipValidation, so this stays cheap)
+        response = FullAnalysisResponse.model_validate(analysis)
+        return ORJSONResponse(response.model_dump(mode="json"))
     except HTTPException:
         raise
     except Exception as e:
@@ -65,7 +69,8 @@ async def get_analysis(
         if not report.get("ai_analysis"):
             raise HTTPException(status_code=404, detail="Analysis not available")
 
-        return report["ai_analysis"]
+        # Stored analysis is already JSON-native: hand it to orjson as-is
+        return ORJSONResponse(report["ai_analysis"])
     except HTTPException:
         raise
     except Exception as e:
@@ -5,7 +5,8 @@ Endpoints for user authentication and management.
 """
 
 from fastapi import APIRouter, HTTPException, status, Request, Depends
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, Dict
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -34,6 +35,11 @@ _FORGOT_PASSWORD_MAX = 3  # max requests per hour per email
 _FORGOT_PASSWORD_WINDOW = 3600  # 1 hour in seconds
 _FORGOT_PASSWORD_MAX_KEYS = 5000  # max tracked emails
 
+# DB value -> enum member, for lookups without Enum() exception handling.
+# users.role/status are Postgres enums, so values are already upper-case.
+_ROLE_MAP: Dict[str, UserRole] = {r.value: r for r in UserRole}
+_STATUS_MAP: Dict[str, UserStatus] = {s.value: s for s in UserStatus}
+
 
 def _check_forgot_rate_limit(email: str) -> bool:
     """Returns True if rate limit is NOT exceeded."""
@@ -59,6 +65,37 @@ def _check_forgot_rate_limit(email: str) -> bool:
     return len(_forgot_password_attempts[email]) < _FORGOT_PASSWORD_MAX
 
 
+_TIMESTAMP = TypeAdapter(Optional[datetime])
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Database timestamps arrive as ISO strings; UserResponse holds datetimes.
+
+    Parsed by pydantic: PostgREST trims trailing zeros from fractional
+    seconds, which datetime.fromisoformat rejects before Python 3.11.
+    """
+    return _TIMESTAMP.validate_python(value)
+
+
+def _user_response(user: dict, role: UserRole, user_status: UserStatus) -> UserResponse:
+    """
+    Build UserResponse from a users row without re-validation.
+    Rows come from our own repository; only the timestamps need parsing
+    to match the declared field types.
+    """
+    return UserResponse.model_construct(
+        id=user["id"],
+        email=user["email"],
+        full_name=user["full_name"],
+        employee_id=user.get("employee_id"),
+        department=user.get("department"),
+        role=role,
+        status=user_status,
+        last_login=_parse_timestamp(user.get("last_login")),
+        created_at=_parse_timestamp(user["created_at"])
+    )
+
+
 # ============== Login ==============
 
 @router.post("/login", response_model=TokenResponse)
@@ -88,8 +125,8 @@ async def login(credentials: UserLogin, request: Request):
             )
 
         # Check if account is active - use same error to prevent enumeration
-        user_status = str(user.get("status", "")).upper()
-        if user_status != "ACTIVE":
+        user_status = user.get("status") or ""
+        if user_status != UserStatus.ACTIVE.value:
             logger.warning(f"Inactive account login attempt: {credentials.email}, status: {user_status}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -108,15 +145,12 @@ async def login(credentials: UserLogin, request: Request):
         await user_repo.update_last_login(user["id"])
 
         # Create tokens - handle role safely
-        user_role_str = str(user.get("role", "INTAKE_OFFICER")).upper()
-        try:
-            user_role = UserRole(user_role_str)
-        except ValueError:
+        user_role_str = user.get("role") or UserRole.INTAKE_OFFICER.value
+        user_role = _ROLE_MAP.get(user_role_str)
+        if user_role is None:
             logger.warning(f"Unknown role {user_role_str}, defaulting to INTAKE_OFFICER")
             user_role = UserRole.INTAKE_OFFICER
 
-        user_status_enum = UserStatus(user_status) if user_status in ["ACTIVE", "INACTIVE", "SUSPENDED"] else UserStatus.ACTIVE
-
         access_token = create_access_token(
             user_id=user["id"],
             email=user["email"],
@@ -126,23 +160,15 @@ async def login(credentials: UserLogin, request: Request):
 
         logger.info(f"User logged in: {user['email']} ({user_role})")
 
-        return TokenResponse(
+        # Skip response_model validation; the model is kept for the OpenAPI schema
+        response = TokenResponse.model_construct(
             access_token=access_token,
             refresh_token=refresh_token,
             expires_in=settings.jwt_expiry_minutes * 60,
-            user=UserResponse(
-                id=user["id"],
-                email=user["email"],
-                full_name=user["full_name"],
-                employee_id=user.get("employee_id"),
-                department=user.get("department"),
-                role=user_role,
-                status=user_status_enum,
-                last_login=user.get("last_login"),
-                created_at=user["created_at"]
-            ),
+            user=_user_response(user, user_role, UserStatus.ACTIVE),
             must_change_password=bool(user.get("must_change_password", False))
         )
+        return ORJSONResponse(response.model_dump(mode="json"))
     except HTTPException:
         raise
     except Exception as e:
@@ -173,7 +199,7 @@ async def forgot_password(data: ForgotPasswordRequest, request: Request):
     # Look up user
     user = await user_repo.get_by_email(email)
 
-    if user and str(user.get("status", "")).upper() == "ACTIVE":
+    if user and user.get("status") == UserStatus.ACTIVE.value:
         # Generate secure token
         token = secrets.token_urlsafe(32)
         expires = datetime.utcnow() + timedelta(hours=1)
@@ -279,17 +305,12 @@ async def register(
 
     logger.info(f"New user registered by {current_user.email}: {user['email']}")
 
-    return UserResponse(
-        id=user["id"],
-        email=user["email"],
-        full_name=user["full_name"],
-        employee_id=user.get("employee_id"),
-        department=user.get("department"),
-        role=UserRole(user["role"]),
-        status=UserStatus(user["status"]),
-        last_login=user.get("last_login"),
-        created_at=user["created_at"]
+    response = _user_response(
+        user,
+        _ROLE_MAP.get(user["role"], UserRole.INTAKE_OFFICER),
+        _STATUS_MAP.get(user["status"], UserStatus.ACTIVE)
     )
+    return ORJSONResponse(response.model_dump(mode="json"))
 
 
 # ============== Token Refresh ==============
@@ -313,7 +334,7 @@ async def refresh_token(data: RefreshTokenRequest):
 
     user = await user_repo.get_by_id(payload["sub"])
 
-    if not user or str(user.get("status", "")).upper() != "ACTIVE":
+    if not user or user.get("status") != UserStatus.ACTIVE.value:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User tidak ditemukan atau tidak aktif"
@@ -327,7 +348,7 @@ async def refresh_token(data: RefreshTokenRequest):
         )
 
     # Create new access token
-    user_role = UserRole(str(user["role"]).upper())
+    user_role = _ROLE_MAP.get(user["role"], UserRole.INTAKE_OFFICER)
     new_access_token = create_access_token(
         user_id=user["id"],
         email=user["email"],
@@ -360,17 +381,12 @@ async def get_me(current_user: TokenData = Depends(require_auth)):
             detail="User tidak ditemukan"
         )
 
-    return UserResponse(
-        id=user["id"],
-        email=user["email"],
-        full_name=user["full_name"],
-        employee_id=user.get("employee_id"),
-        department=user.get("department"),
-        role=UserRole(user["role"]),
-        status=UserStatus(user["status"]),
-        last_login=user.get("last_login"),
-        created_at=user["created_at"]
+    response = _user_response(
+        user,
+        _ROLE_MAP.get(user["role"], UserRole.INTAKE_OFFICER),
+        _STATUS_MAP.get(user["status"], UserStatus.ACTIVE)
     )
+    return ORJSONResponse(response.model_dump(mode="json"))
 
 
 # ============== Change Password ==============
@@ -451,22 +467,11 @@ async def list_users(
     """
     per_page = min(per_page, 100)
     offset = (max(page, 1) - 1) * per_page
+    # list_all already projects to the public user columns
     users = await user_repo.list_all(role=role, status=status, limit=per_page, offset=offset)
 
     return {
-        "users": [
-            {
-                "id": u["id"],
-                "email": u["email"],
-                "full_name": u["full_name"],
-                "role": u["role"],
-                "status": u["status"],
-                "department": u.get("department"),
-                "last_login": u.get("last_login"),
-                "created_at": u["created_at"]
-            }
-            for u in users
-        ],
+        "users": users,
         "total": len(users),
         "page": page,
         "per_page": per_page
@@ -5,6 +5,7 @@ Dashboard statistics and audit log endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from loguru import logger
 
@@ -25,7 +26,7 @@ async def get_dashboard_stats(
         stats = await report_repo.get_statistics()
         sla_at_risk = await report_repo.get_sla_at_risk_count()
 
-        return DashboardStats(
+        stats_response = DashboardStats.model_construct(
             total_reports=stats["total"],
             by_status=stats["by_status"],
             by_severity=stats["by_severity"],
@@ -37,6 +38,7 @@ async def get_dashboard_stats(
             closure_rate=stats.get("closure_rate", 0.0),
             recent_reports_7d=stats.get("recent_reports_7d", 0),
         )
+        return ORJSONResponse(stats_response.model_dump(mode="json"))
     except Exception as e:
         logger.error(f"Failed to get stats: {e}")
         raise HTTPException(status_code=500, detail=GENERIC_ERROR_MESSAGE)
@@ -60,12 +62,12 @@ async def get_audit_logs(
             date_from=date_from, date_to=date_to,
             limit=per_page, offset=offset,
         )
-        return {
+        return ORJSONResponse({
             "logs": result["logs"],
             "total": result["total"],
             "page": page,
             "per_page": per_page,
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to get audit logs: {e}")
         raise HTTPException(status_code=500, detail=GENERIC_ERROR_MESSAGE)
@@ -5,7 +5,7 @@ CRUD operations for whistleblowing reports.
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Depends, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import Optional
 from datetime import datetime
 from io import StringIO
@@ -16,6 +16,7 @@ from config import (
     get_allowed_status_transitions, GENERIC_ERROR_MESSAGE, STATUS_DESCRIPTIONS,
 )
 from database import report_repo, message_repo
+from services.notification_service import notification_service
 from models import (
     ReportCreate, ReportResponse, ReportDetail, ReportListResponse,
     MessageCreate, StatusUpdate,
@@ -106,11 +107,14 @@ async def list_reports(
             limit=per_page, offset=offset,
         )
 
-        return ReportListResponse(
+        # Rows come from our own repository: skip re-validation and
+        # response_model serialization, keep the model for the OpenAPI schema
+        response = ReportListResponse.model_construct(
             total=total_count,
-            reports=[ReportResponse(**r) for r in reports],
+            reports=[ReportResponse.model_construct(**r) for r in reports],
             page=page, per_page=per_page,
         )
+        return ORJSONResponse(response.model_dump(mode="json", by_alias=True))
     except Exception as e:
         logger.error(f"Failed to list reports: {e}")
         raise HTTPException(status_code=500, detail=GENERIC_ERROR_MESSAGE)
@@ -177,11 +181,12 @@ async def get_report(
 
         messages = await message_repo.get_by_report(report_id)
         attachments = await report_repo.get_attachments(report_id)
-        return ReportDetail(
+        detail = ReportDetail.model_construct(
             **report,
             messages_count=len(messages),
             attachments=attachments,
         )
+        return ORJSONResponse(detail.model_dump(mode="json", by_alias=True))
     except HTTPException:
         raise
     except Exception as e:
@@ -213,7 +218,6 @@ async def get_report_attachments(
 async def update_report_status(
     report_id: str,
     update: StatusUpdate,
-    background_tasks: BackgroundTasks,
     current_user: TokenData = Depends(require_min_role(UserRole.INTAKE_OFFICER)),
 ):
     """Update report status (Intake Officer+)."""
@@ -241,15 +245,12 @@ async def update_report_status(
 
         await report_repo.update_status(report_id, new_status, updated_by=current_user.email)
 
-        # Send notification in background
-        from services import NotificationService
-        notification_service = NotificationService()
+        # Queue notification; the outbox worker sends and retries it
         ticket_id = report.get("ticket_id")
         reporter_phone = report.get("reporter_phone")
         reporter_email = report.get("reporter_email")
         if ticket_id and (reporter_phone or reporter_email):
-            background_tasks.add_task(
-                notification_service.send_status_update,
+            notification_service.queue_status_update(
                 ticket_id=ticket_id, old_status=current_status,
                 new_status=new_status, reporter_phone=reporter_phone,
                 reporter_email=reporter_email, note=update.notes,
@@ -4,31 +4,41 @@ WBS BPKH AI - Webhooks Router
 Endpoints for receiving external webhooks (WhatsApp, Email, etc.)
 """
 
-from fastapi import APIRouter, HTTPException, status, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, Request, BackgroundTasks, Depends
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, AliasChoices
 from loguru import logger
 from datetime import datetime
+from dataclasses import dataclass
 import re
 import uuid
 import time
 
 from database import report_repo, message_repo
-from services.notification_service import notification_service
-from config import settings
+from services.notification_service import notification_service, NotificationChannel
+from config import settings, REPORTER_STATUS_LABELS
 
 router = APIRouter(prefix="/api/v1/webhooks", tags=["Webhooks"])
 
+# Precompiled patterns
+_TICKET_RE = re.compile(r'\b[A-F0-9]{8}\b', re.IGNORECASE)  # 8 hex characters
+_SUBJECT_TICKET_RE = re.compile(r'Tiket #([A-F0-9]{8})\b', re.IGNORECASE)  # our email subjects
+_REPLY_PREFIX_RE = re.compile(r'^(Re:|Fwd:|FW:)\s*', re.IGNORECASE)
+_ON_WROTE_RE = re.compile(r'\nOn .* wrote:')
+
 
 # ============== Pydantic Models ==============
 
 class WAHAMessage(BaseModel):
-    """WAHA incoming message payload."""
-    id: str
-    from_: str = Field(alias="from")
-    to: str
-    body: str
-    timestamp: int
+    """WAHA incoming message payload.
+
+    Fields are optional because non-message events reuse the payload key.
+    """
+    id: Optional[str] = None
+    from_: str = Field(default="", alias="from")
+    to: Optional[str] = None
+    body: Optional[str] = None
+    timestamp: Optional[int] = None
     type: str = "chat"
 
     class Config:
@@ -38,16 +48,16 @@ class WAHAMessage(BaseModel):
 class WAHAWebhook(BaseModel):
     """WAHA webhook payload."""
     event: str
-    session: str
-    payload: Dict[str, Any]
+    session: Optional[str] = None
+    payload: WAHAMessage = Field(default_factory=WAHAMessage)
 
 
 class EmailWebhook(BaseModel):
     """Incoming email webhook payload (from email-to-webhook service)."""
     from_email: str = Field(alias="from")
-    to: str
-    subject: str
-    body_text: str
+    to: Optional[str] = None
+    subject: Optional[str] = ""
+    body_text: Optional[str] = Field(default="", validation_alias=AliasChoices("body_text", "text"))
     body_html: Optional[str] = None
     attachments: Optional[list] = None
     received_at: Optional[str] = None
@@ -56,14 +66,81 @@ class EmailWebhook(BaseModel):
         populate_by_name = True
 
 
+@dataclass(slots=True, frozen=True)
+class ParsedMessage:
+    """Normalized incoming WhatsApp message, built once per webhook."""
+    body: str
+    from_: str
+    event: str
+    timestamp: int = 0
+
+    MAX_BODY_CHARS = 5000  # cap message length to prevent abuse
+
+    @classmethod
+    def from_webhook(cls, webhook: WAHAWebhook) -> "ParsedMessage":
+        payload = webhook.payload
+        return cls(
+            body=(payload.body or "").strip()[:cls.MAX_BODY_CHARS],
+            from_=payload.from_.replace("@c.us", ""),
+            event=webhook.event,
+            timestamp=payload.timestamp or 0,
+        )
+
+
+# ============== Webhook Authentication ==============
+# Run as dependencies so unauthenticated calls get 401 before body validation
+
+def verify_waha_key(request: Request):
+    """Verify WhatsApp webhook source via API key header."""
+    if settings.waha_api_key:
+        api_key = request.headers.get("X-Api-Key", "")
+        if api_key != settings.waha_api_key:
+            logger.warning(f"WhatsApp webhook: invalid API key from {request.client.host if request.client else 'unknown'}")
+            raise HTTPException(status_code=401, detail="Invalid webhook key")
+
+
+def verify_email_secret(request: Request):
+    """Verify email webhook source via shared secret header."""
+    if settings.secret_key:
+        webhook_secret = request.headers.get("X-Webhook-Secret", "")
+        if not webhook_secret or webhook_secret != settings.secret_key:
+            logger.warning(f"Email webhook: invalid or missing secret from {request.client.host if request.client else 'unknown'}")
+            raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+
 # ============== Helper Functions ==============
 
 def extract_ticket_from_message(text: str) -> Optional[str]:
     """Extract ticket ID from message text."""
-    # Pattern: 8 uppercase hex characters
-    pattern = r'\b([A-F0-9]{8})\b'
-    match = re.search(pattern, text.upper())
-    return match.group(1) if match else None
+    if len(text) < 8:
+        return None
+    # Match case-insensitively and upper-case only the 8 matched characters
+    match = _TICKET_RE.search(text)
+    return match.group(0).upper() if match else None
+
+
+def extract_ticket_from_subject(subject: str) -> Optional[str]:
+    """Extract ticket ID from an email subject.
+
+    Replies to our notifications carry "Tiket #<id>", so look for that
+    literal first and only fall back to a free-form scan.
+    """
+    match = _SUBJECT_TICKET_RE.search(subject)
+    if match:
+        return match.group(1).upper()
+    return extract_ticket_from_message(subject)
+
+
+def strip_quoted_reply(body: str) -> str:
+    """Cut an email reply at the footer ("---") or the first quoted block."""
+    head = body.partition("---")[0].strip()
+    end = head.find("\n>")
+    if end < 0:
+        end = len(head)
+    match = _ON_WROTE_RE.search(head, 0, end)
+    if match:
+        end = match.start()
+    return head[:end].strip()
 
 
 def parse_report_from_text(text: str) -> Dict[str, str]:
@@ -86,7 +163,7 @@ def parse_report_from_text(text: str) -> Dict[str, str]:
 def parse_email_report(subject: str, body: str) -> Dict[str, str]:
     """Parse report from email content."""
     # Clean subject
-    clean_subject = re.sub(r'^(Re:|Fwd:|FW:)\s*', '', subject, flags=re.IGNORECASE).strip()
+    clean_subject = _REPLY_PREFIX_RE.sub('', subject).strip()
 
     return {
         "subject": clean_subject[:200] if clean_subject else "Laporan via Email",
@@ -96,9 +173,9 @@ def parse_email_report(subject: str, body: str) -> Dict[str, str]:
 
 # ============== WhatsApp Webhook ==============
 
-@router.post("/whatsapp")
+@router.post("/whatsapp", dependencies=[Depends(verify_waha_key)])
 async def whatsapp_webhook(
-    request: Request,
+    body: WAHAWebhook,
     background_tasks: BackgroundTasks
 ):
     """
@@ -109,50 +186,42 @@ async def whatsapp_webhook(
     - "STATUS <ticket_id>" - Check report status
     - "<ticket_id> <message>" - Send message to existing report
     """
-    try:
-        # Verify webhook source via API key header
-        if settings.waha_api_key:
-            api_key = request.headers.get("X-Api-Key", "")
-            if api_key != settings.waha_api_key:
-                logger.warning(f"WhatsApp webhook: invalid API key from {request.client.host if request.client else 'unknown'}")
-                raise HTTPException(status_code=401, detail="Invalid webhook key")
+    event = body.event
+    logger.info(f"WhatsApp webhook received: {event}")
 
-        body = await request.json()
-        logger.info(f"WhatsApp webhook received: {body.get('event', 'unknown')}")
+    # Only process incoming messages
+    if event != "message":
+        return {"status": "ignored", "reason": f"Event type: {event}"}
 
-        event = body.get("event")
+    pm = ParsedMessage.from_webhook(body)
 
-        # Only process incoming messages
-        if event != "message":
-            return {"status": "ignored", "reason": f"Event type: {event}"}
+    if not pm.body:
+        return {"status": "ignored", "reason": "Empty message"}
 
-        payload = body.get("payload", {})
-        message_body = payload.get("body", "").strip()
-        from_number = payload.get("from", "").replace("@c.us", "")
+    # Replay protection: reject messages older than 5 minutes
+    if pm.timestamp and abs(time.time() - pm.timestamp) > 300:
+        logger.warning(f"WhatsApp webhook: stale message (timestamp: {pm.timestamp})")
+        return {"status": "ignored", "reason": "Stale message"}
 
-        if not message_body:
-            return {"status": "ignored", "reason": "Empty message"}
+    # Ack now so WAHA doesn't retry while we hit the DB and send replies
+    background_tasks.add_task(process_whatsapp_message, pm)
+    return {"status": "accepted"}
 
-        # Replay protection: reject messages older than 5 minutes
-        msg_timestamp = payload.get("timestamp", 0)
-        if msg_timestamp and abs(time.time() - msg_timestamp) > 300:
-            logger.warning(f"WhatsApp webhook: stale message (timestamp: {msg_timestamp})")
-            return {"status": "ignored", "reason": "Stale message"}
 
-        # Cap message length to prevent abuse
-        if len(message_body) > 5000:
-            message_body = message_body[:5000]
-
-        message_upper = message_body.upper()
+async def process_whatsapp_message(pm: ParsedMessage) -> Dict[str, Any]:
+    """Handle a validated WhatsApp message (runs after the webhook returns)."""
+    try:
+        # Commands are prefixes: upper-case only the head, not the whole body
+        prefix = pm.body[:7].upper()
 
         # Command: Create new report
-        if message_upper.startswith("LAPOR:") or message_upper.startswith("LAPOR "):
-            report_text = message_body[6:].strip()  # Remove "LAPOR:" prefix
+        if prefix.startswith(("LAPOR:", "LAPOR ")):
+            report_text = pm.body[6:].strip()  # Remove "LAPOR:" prefix
 
             if len(report_text) < 20:
                 # Too short, send help
                 await notification_service.whatsapp.send_message(
-                    from_number,
+                    pm.from_,
                     """Untuk membuat laporan, kirim pesan dengan format:
 
 LAPOR: [Deskripsi lengkap pelanggaran]
@@ -167,17 +236,17 @@ Sertakan detail: Apa, Siapa, Kapan, Dimana, dan Bagaimana."""
             # Parse and create report
             parsed = parse_report_from_text(report_text)
 
-            report = await report_repo.create({
+            report = await report_repo.create_buffered({
                 "subject": parsed["subject"],
                 "description": parsed["description"],
                 "category": "LAINNYA",
-                "reporter_contact": from_number,
+                "reporter_contact": pm.from_,
                 "channel": "WHATSAPP"
             })
 
             # Send confirmation
             await notification_service.whatsapp.send_report_confirmation(
-                from_number,
+                pm.from_,
                 report["ticket_id"]
             )
 
@@ -185,12 +254,12 @@ Sertakan detail: Apa, Siapa, Kapan, Dimana, dan Bagaimana."""
             return {"status": "report_created", "ticket_id": report["ticket_id"]}
 
         # Command: Check status
-        elif message_upper.startswith("STATUS"):
-            ticket_id = extract_ticket_from_message(message_body)
+        elif prefix.startswith("STATUS"):
+            ticket_id = extract_ticket_from_message(pm.body)
 
             if not ticket_id:
                 await notification_service.whatsapp.send_message(
-                    from_number,
+                    pm.from_,
                     """Untuk cek status, kirim:
 STATUS <ID Tiket>
 
@@ -204,51 +273,39 @@ STATUS A1B2C3D4"""
 
             if not report:
                 await notification_service.whatsapp.send_message(
-                    from_number,
+                    pm.from_,
                     f"Laporan dengan ID Tiket {ticket_id} tidak ditemukan."
                 )
                 return {"status": "not_found"}
 
-            status_labels = {
-                "NEW": "Diterima",
-                "REVIEWING": "Sedang Ditinjau",
-                "NEED_INFO": "Butuh Informasi Tambahan",
-                "INVESTIGATING": "Dalam Investigasi",
-                "HOLD": "Ditangguhkan",
-                "ESCALATED": "Dieskalasi",
-                "CLOSED_PROVEN": "Selesai - Terbukti",
-                "CLOSED_NOT_PROVEN": "Selesai - Tidak Terbukti",
-                "CLOSED_INVALID": "Ditutup - Tidak Valid"
-            }
-
-            status_label = status_labels.get(report["status"], report["status"])
+            status_label = REPORTER_STATUS_LABELS.get(report["status"], report["status"])
 
             await notification_service.whatsapp.send_message(
-                from_number,
+                pm.from_,
                 f"""*Status Laporan*
 ID Tiket: {ticket_id}
 Status: *{status_label}*
 Tanggal Lapor: {report['created_at'][:10]}
 
 Untuk detail lengkap, kunjungi:
-https://wbs-bpkh.up.railway.app"""
+{settings.wbs_portal_url}"""
             )
             return {"status": "status_sent"}
 
         # Try to match existing ticket and send message
         else:
-            ticket_id = extract_ticket_from_message(message_body)
+            ticket_id = extract_ticket_from_message(pm.body)
 
             if ticket_id:
                 report = await report_repo.get_by_ticket_id(ticket_id)
 
                 if report:
                     # Remove ticket ID from message
-                    clean_message = re.sub(r'\b[A-F0-9]{8}\b', '', message_body, flags=re.IGNORECASE).strip()
+                    clean_message = _TICKET_RE.sub('', pm.body).strip()
 
                     if clean_message:
                         # Save message
-                        await message_repo.create(
+                        await message_repo.create_buffered(
                             report_id=report["id"],
                             content=clean_message,
                             sender_type="REPORTER",
@@ -256,14 +313,14 @@ https://wbs-bpkh.up.railway.app"""
                         )
 
                         await notification_service.whatsapp.send_message(
-                            from_number,
+                            pm.from_,
                             f"Pesan Anda untuk tiket {ticket_id} telah terkirim."
                         )
                         return {"status": "message_sent"}
 
             # Unknown command, send help
             await notification_service.whatsapp.send_message(
-                from_number,
+                pm.from_,
                 """*WBS BPKH - Whistleblowing System*
 
 Perintah yang tersedia:
@@ -291,9 +348,9 @@ A1B2C3D4 Ada informasi tambahan..."""
 
 # ============== Email Webhook ==============
 
-@router.post("/email")
+@router.post("/email", dependencies=[Depends(verify_email_secret)])
 async def email_webhook(
-    request: Request,
+    body: EmailWebhook,
     background_tasks: BackgroundTasks
 ):
     """
@@ -303,46 +360,43 @@ async def email_webhook(
     - "[LAPOR] <subject>" - Create new report
     - "Re: [WBS BPKH] ... Tiket #<ticket_id>" - Reply to existing report
     """
+    from_email = body.from_email
+    logger.info(f"Email webhook received from: {from_email}")
+
+    if not body.body_text:
+        return {"status": "ignored", "reason": "Empty body"}
+
+    # Replay protection: reject emails older than 5 minutes
+    received_at = body.received_at
+    if received_at:
+        try:
+            recv_time = datetime.fromisoformat(received_at.replace("Z", "+00:00"))
+            if abs((datetime.utcnow() - recv_time.replace(tzinfo=None)).total_seconds()) > 300:
+                logger.warning(f"Email webhook: stale message (received_at: {received_at})")
+                return {"status": "ignored", "reason": "Stale message"}
+        except (ValueError, TypeError):
+            pass
+
+    # Ack now; report/message creation and replies happen afterwards
+    background_tasks.add_task(process_email_message, from_email, body.subject, body.body_text)
+    return {"status": "accepted"}
+
+
+async def process_email_message(from_email: str, subject: Optional[str], body_text: str) -> Dict[str, Any]:
+    """Handle a validated incoming email (runs after the webhook returns)."""
     try:
-        # Verify webhook source via shared secret header
-        if settings.secret_key:
-            webhook_secret = request.headers.get("X-Webhook-Secret", "")
-            if not webhook_secret or webhook_secret != settings.secret_key:
-                logger.warning(f"Email webhook: invalid or missing secret from {request.client.host if request.client else 'unknown'}")
-                raise HTTPException(status_code=401, detail="Invalid webhook secret")
-        body = await request.json()
-        logger.info(f"Email webhook received from: {body.get('from', 'unknown')}")
-
-        from_email = body.get("from", "")
-        subject = body.get("subject", "")
-        body_text = body.get("body_text", body.get("text", ""))
-
-        if not body_text:
-            return {"status": "ignored", "reason": "Empty body"}
-
-        # Replay protection: reject emails older than 5 minutes
-        received_at = body.get("received_at")
-        if received_at:
-            try:
-                recv_time = datetime.fromisoformat(received_at.replace("Z", "+00:00"))
-                if abs((datetime.utcnow() - recv_time.replace(tzinfo=None)).total_seconds()) > 300:
-                    logger.warning(f"Email webhook: stale message (received_at: {received_at})")
-                    return {"status": "ignored", "reason": "Stale message"}
-            except (ValueError, TypeError):
-                pass
-
         # Cap lengths to prevent abuse
         subject = subject[:200] if subject else ""
         if len(body_text) > 10000:
             body_text = body_text[:10000]
 
-        subject_upper = subject.upper()
+        subject_prefix = subject[:7].upper()
 
         # New report: [LAPOR] prefix
-        if subject_upper.startswith("[LAPOR]") or subject_upper.startswith("LAPOR:"):
+        if subject_prefix.startswith(("[LAPOR]", "LAPOR:")):
             parsed = parse_email_report(subject, body_text)
 
-            report = await report_repo.create({
+            report = await report_repo.create_buffered({
                 "subject": parsed["subject"].replace("[LAPOR]", "").replace("[lapor]", "").strip(),
                 "description": parsed["description"],
                 "category": "LAINNYA",
@@ -350,28 +404,28 @@ async def email_webhook(
                 "channel": "EMAIL"
             })
 
-            # Send confirmation
-            await notification_service.email.send_report_confirmation(
-                from_email,
-                report["ticket_id"]
+            # Queue confirmation (batched with other sends in the burst)
+            notification_service.queue_report_confirmation(
+                ticket_id=report["ticket_id"],
+                reporter_email=from_email,
+                channel=NotificationChannel.EMAIL,
             )
 
             logger.info(f"Report created via Email: {report['ticket_id']}")
             return {"status": "report_created", "ticket_id": report["ticket_id"]}
 
         # Reply to existing report
-        ticket_id = extract_ticket_from_message(subject)
+        ticket_id = extract_ticket_from_subject(subject)
 
         if ticket_id:
             report = await report_repo.get_by_ticket_id(ticket_id)
 
             if report:
                 # Clean the reply (remove quoted text)
-                clean_body = body_text.split("---")[0].strip()  # Remove footer
-                clean_body = re.split(r'\n>|\nOn .* wrote:', clean_body)[0].strip()  # Remove quoted
+                clean_body = strip_quoted_reply(body_text)
 
                 if clean_body:
-                    await message_repo.create(
+                    await message_repo.create_buffered(
                         report_id=report["id"],
                         content=clean_body,
                         sender_type="REPORTER",
@@ -384,7 +438,7 @@ async def email_webhook(
         # Unknown format, create as new report
         parsed = parse_email_report(subject, body_text)
 
-        report = await report_repo.create({
+        report = await report_repo.create_buffered({
             "subject": parsed["subject"],
             "description": parsed["description"],
             "category": "LAINNYA",
@@ -392,9 +446,10 @@ async def email_webhook(
             "channel": "EMAIL"
         })
 
-        await notification_service.email.send_report_confirmation(
-            from_email,
-            report["ticket_id"]
+        notification_service.queue_report_confirmation(
+            ticket_id=report["ticket_id"],
+            reporter_email=from_email,
+            channel=NotificationChannel.EMAIL,
         )
 
         logger.info(f"Report created via Email (fallback): {report['ticket_id']}")
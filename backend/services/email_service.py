@@ -7,166 +7,87 @@ Handles email sending/receiving via SMTP.
 import smtplib
 import ssl
 import html
+import random
+import re
+import threading
+import time
+from email import encoders
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.mime.nonmultipart import MIMENonMultipart
 from email.utils import formataddr
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 from loguru import logger
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from string import Template
 
-from config import settings
+from config import settings, REPORTER_STATUS_LABELS
 
 
-class EmailService:
-    """Service for email integration using SMTP."""
-
-    def __init__(self):
-        self.smtp_host = settings.smtp_host
-        self.smtp_port = settings.smtp_port
-        self.smtp_user = settings.smtp_user
-        self.smtp_password = settings.smtp_password
-        self.wbs_email = settings.wbs_email
-        self.enabled = bool(self.smtp_host and self.smtp_user and self.smtp_password)
-        self._executor = ThreadPoolExecutor(max_workers=2)
-
-    def is_configured(self) -> bool:
-        """Check if email service is properly configured."""
-        return self.enabled
-
-    def _create_message(
-        self,
-        to: str,
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None
-    ) -> MIMEMultipart:
-        """Create email message."""
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = formataddr(("WBS BPKH", self.wbs_email))
-        msg["To"] = to
-
-        # Plain text version
-        part1 = MIMEText(body_text, "plain", "utf-8")
-        msg.attach(part1)
-
-        # HTML version (if provided)
-        if body_html:
-            part2 = MIMEText(body_html, "html", "utf-8")
-            msg.attach(part2)
-
-        return msg
-
-    def _send_sync(self, to: str, subject: str, body_text: str, body_html: Optional[str] = None) -> Dict[str, Any]:
-        """Synchronous email send with retry logic (runs in thread pool)."""
-        import time as _time
-
-        max_retries = 3
-        retry_delays = [2, 5, 10]  # seconds
-
-        last_error = None
-        for attempt in range(max_retries):
-            try:
-                msg = self._create_message(to, subject, body_text, body_html)
+# ============== Templates ==============
+# Bodies are parsed once at import; per-send work is a single substitute()
 
-                context = ssl.create_default_context()
+_PORTAL_URL = settings.wbs_portal_url
 
-                with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as server:
-                    server.starttls(context=context)
-                    server.login(self.smtp_user, self.smtp_password)
-                    server.sendmail(self.wbs_email, to, msg.as_string())
+_SIGNATURE_TEXT = """Wassalamu'alaikum Wr. Wb.
+Tim WBS BPKH
 
-                logger.info(f"Email sent to {to[:5]}***")
-                return {"success": True}
+---
+Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
 
-            except smtplib.SMTPException as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    delay = retry_delays[attempt]
-                    logger.warning(f"SMTP error (attempt {attempt + 1}/{max_retries}), retrying in {delay}s: {e}")
-                    _time.sleep(delay)
-                else:
-                    logger.error(f"SMTP error after {max_retries} attempts: {e}")
-            except Exception as e:
-                last_error = e
-                logger.error(f"Email send error: {e}")
-                break  # Non-SMTP errors are not retryable
 
-        return {"success": False, "error": str(last_error)}
+class _BytesTemplate:
+    """${name} template pre-encoded to UTF-8 chunks.
 
-    async def send_email(
-        self,
-        to: str,
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Send an email asynchronously.
+    The static HTML is encoded once at import, so rendering only encodes
+    the substituted values and joins bytes.
+    """
 
-        Args:
-            to: Recipient email address
-            subject: Email subject
-            body_text: Plain text body
-            body_html: Optional HTML body
+    __slots__ = ("_chunks", "_names")
 
-        Returns:
-            Response dict with success status
-        """
-        if not self.is_configured():
-            logger.warning("Email service not configured, skipping send")
-            return {"success": False, "error": "Email not configured"}
+    def __init__(self, template: str):
+        parts = re.split(r"\$\{(\w+)\}", template)
+        self._chunks = [part.encode("utf-8") for part in parts[0::2]]
+        self._names = parts[1::2]
 
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            self._executor,
-            self._send_sync,
-            to, subject, body_text, body_html
-        )
+    def substitute(self, **values: str) -> bytes:
+        out = [self._chunks[0]]
+        for name, chunk in zip(self._names, self._chunks[1:]):
+            out.append(values[name].encode("utf-8"))
+            out.append(chunk)
+        return b"".join(out)
 
-    async def send_report_confirmation(
-        self,
-        to: str,
-        ticket_id: str
-    ) -> Dict[str, Any]:
-        """Send report submission confirmation email."""
-        subject = f"[WBS BPKH] Laporan Diterima - Tiket #{ticket_id}"
 
-        body_text = f"""Assalamu'alaikum Wr. Wb.
+_CONFIRMATION_TEXT = Template("""Assalamu'alaikum Wr. Wb.
 
 Laporan Anda telah kami terima.
 
-ID Tiket: {ticket_id}
+ID Tiket: ${ticket_id}
 
 Simpan ID tiket ini untuk memantau status laporan Anda di:
-{settings.wbs_portal_url}
+${portal_url}
 
 Kami akan memproses laporan Anda sesuai prosedur yang berlaku.
 Identitas Anda dijamin kerahasiaannya.
 
-Wassalamu'alaikum Wr. Wb.
-Tim WBS BPKH
-
----
-Email ini dikirim secara otomatis. Mohon tidak membalas email ini.
-Untuk komunikasi lebih lanjut, gunakan portal WBS BPKH."""
+""" + _SIGNATURE_TEXT + """
+Untuk komunikasi lebih lanjut, gunakan portal WBS BPKH.""")
 
-        body_html = f"""
+_CONFIRMATION_HTML = _BytesTemplate("""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }}
-        .ticket-box {{ background: #fff; border: 2px solid #C9A227; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }}
-        .ticket-id {{ font-size: 28px; font-weight: bold; color: #006B3F; letter-spacing: 2px; }}
-        .btn {{ display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 10px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
-        .bismillah {{ text-align: center; color: #C9A227; font-size: 18px; margin-bottom: 10px; }}
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }
+        .ticket-box { background: #fff; border: 2px solid #C9A227; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }
+        .ticket-id { font-size: 28px; font-weight: bold; color: #006B3F; letter-spacing: 2px; }
+        .btn { display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 10px 0; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 12px; }
+        .bismillah { text-align: center; color: #C9A227; font-size: 18px; margin-bottom: 10px; }
     </style>
 </head>
 <body>
@@ -181,12 +102,12 @@ Untuk komunikasi lebih lanjut, gunakan portal WBS BPKH."""
 
             <div class="ticket-box">
                 <p>ID Tiket Anda:</p>
-                <div class="ticket-id">{ticket_id}</div>
+                <div class="ticket-id">${ticket_id}</div>
                 <p style="color: #666; font-size: 12px;">Simpan ID ini untuk memantau status laporan</p>
             </div>
 
             <p style="text-align: center;">
-                <a href="{settings.wbs_portal_url}" class="btn">Pantau Status Laporan</a>
+                <a href="${portal_url}" class="btn">Pantau Status Laporan</a>
             </p>
 
             <p><strong>Kerahasiaan Terjamin</strong><br>
@@ -203,69 +124,35 @@ Untuk komunikasi lebih lanjut, gunakan portal WBS BPKH."""
     </div>
 </body>
 </html>
-"""
+""")
 
-        return await self.send_email(to, subject, body_text, body_html)
-
-    async def send_status_update(
-        self,
-        to: str,
-        ticket_id: str,
-        old_status: str,
-        new_status: str,
-        note: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """Send status update notification email."""
-        status_labels = {
-            "NEW": "Diterima",
-            "REVIEWING": "Sedang Ditinjau",
-            "NEED_INFO": "Butuh Informasi Tambahan",
-            "INVESTIGATING": "Dalam Investigasi",
-            "HOLD": "Ditangguhkan",
-            "ESCALATED": "Dieskalasi",
-            "CLOSED_PROVEN": "Selesai - Terbukti",
-            "CLOSED_NOT_PROVEN": "Selesai - Tidak Terbukti",
-            "CLOSED_INVALID": "Ditutup - Tidak Valid"
-        }
-
-        new_label = status_labels.get(new_status, new_status)
-        subject = f"[WBS BPKH] Update Status - Tiket #{ticket_id}"
-
-        note_text = f"\n\nCatatan:\n{note}" if note else ""
-
-        body_text = f"""Assalamu'alaikum Wr. Wb.
+_STATUS_UPDATE_TEXT = Template("""Assalamu'alaikum Wr. Wb.
 
 Update Status Laporan
-ID Tiket: {ticket_id}
+ID Tiket: ${ticket_id}
 
-Status baru: {new_label}{note_text}
+Status baru: ${new_label}${note_text}
 
 Pantau perkembangan di:
-{settings.wbs_portal_url}
-
-Wassalamu'alaikum Wr. Wb.
-Tim WBS BPKH
+${portal_url}
 
----
-Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
-
-        note_html = f'<div style="background: #f5f5f5; padding: 15px; border-left: 4px solid #C9A227; margin: 15px 0;"><strong>Catatan:</strong><br>{html.escape(note)}</div>' if note else ""
+""" + _SIGNATURE_TEXT)
 
-        body_html = f"""
+_STATUS_UPDATE_HTML = _BytesTemplate("""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }}
-        .status-box {{ background: #fff; border: 2px solid #006B3F; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }}
-        .status {{ font-size: 24px; font-weight: bold; color: #006B3F; }}
-        .ticket {{ color: #666; }}
-        .btn {{ display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }
+        .status-box { background: #fff; border: 2px solid #006B3F; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }
+        .status { font-size: 24px; font-weight: bold; color: #006B3F; }
+        .ticket { color: #666; }
+        .btn { display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 12px; }
     </style>
 </head>
 <body>
@@ -277,15 +164,15 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
             <p>Assalamu'alaikum Wr. Wb.</p>
 
             <div class="status-box">
-                <p class="ticket">ID Tiket: <strong>{ticket_id}</strong></p>
+                <p class="ticket">ID Tiket: <strong>${ticket_id}</strong></p>
                 <p>Status baru:</p>
-                <div class="status">{new_label}</div>
+                <div class="status">${new_label}</div>
             </div>
 
-            {note_html}
+            ${note_html}
 
             <p style="text-align: center;">
-                <a href="{settings.wbs_portal_url}" class="btn">Lihat Detail</a>
+                <a href="${portal_url}" class="btn">Lihat Detail</a>
             </p>
 
             <p>Wassalamu'alaikum Wr. Wb.<br>
@@ -298,46 +185,32 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
     </div>
 </body>
 </html>
-"""
+""")
 
-        return await self.send_email(to, subject, body_text, body_html)
-
-    async def send_new_message_notification(
-        self,
-        to: str,
-        ticket_id: str
-    ) -> Dict[str, Any]:
-        """Notify reporter about new admin message."""
-        subject = f"[WBS BPKH] Pesan Baru - Tiket #{ticket_id}"
-
-        body_text = f"""Assalamu'alaikum Wr. Wb.
+_NEW_MESSAGE_TEXT = Template("""Assalamu'alaikum Wr. Wb.
 
 Ada pesan baru untuk laporan Anda.
 
-ID Tiket: {ticket_id}
+ID Tiket: ${ticket_id}
 
 Silakan cek pesan di:
-{settings.wbs_portal_url}
+${portal_url}
 
-Wassalamu'alaikum Wr. Wb.
-Tim WBS BPKH
+""" + _SIGNATURE_TEXT)
 
----
-Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
-
-        body_html = f"""
+_NEW_MESSAGE_HTML = _BytesTemplate("""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }}
-        .message-icon {{ font-size: 48px; text-align: center; margin: 20px 0; }}
-        .btn {{ display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }
+        .message-icon { font-size: 48px; text-align: center; margin: 20px 0; }
+        .btn { display: inline-block; background: #006B3F; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 12px; }
     </style>
 </head>
 <body>
@@ -351,10 +224,10 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
             <div class="message-icon">&#128172;</div>
 
             <p style="text-align: center;">Ada pesan baru untuk laporan Anda.<br>
-            <strong>ID Tiket: {ticket_id}</strong></p>
+            <strong>ID Tiket: ${ticket_id}</strong></p>
 
             <p style="text-align: center;">
-                <a href="{settings.wbs_portal_url}" class="btn">Buka Pesan</a>
+                <a href="${portal_url}" class="btn">Buka Pesan</a>
             </p>
 
             <p>Wassalamu'alaikum Wr. Wb.<br>
@@ -367,51 +240,37 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
     </div>
 </body>
 </html>
-"""
-
-        return await self.send_email(to, subject, body_text, body_html)
+""")
 
-    async def send_password_reset(
-        self,
-        to: str,
-        reset_url: str
-    ) -> Dict[str, Any]:
-        """Send password reset email with reset link."""
-        subject = "[WBS BPKH] Reset Password"
-
-        body_text = f"""Assalamu'alaikum Wr. Wb.
+_PASSWORD_RESET_TEXT = Template("""Assalamu'alaikum Wr. Wb.
 
 Anda menerima email ini karena ada permintaan reset password untuk akun WBS BPKH Anda.
 
 Klik link berikut untuk mereset password:
-{reset_url}
+${reset_url}
 
 Link ini berlaku selama 1 jam.
 
 Jika Anda tidak meminta reset password, abaikan email ini.
 
-Wassalamu'alaikum Wr. Wb.
-Tim WBS BPKH
-
----
-Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
+""" + _SIGNATURE_TEXT)
 
-        body_html = f"""
+_PASSWORD_RESET_HTML = _BytesTemplate("""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }}
-        .reset-box {{ background: #fff; border: 2px solid #C9A227; padding: 25px; text-align: center; margin: 20px 0; border-radius: 8px; }}
-        .btn {{ display: inline-block; background: #006B3F; color: white; padding: 14px 40px; text-decoration: none; border-radius: 5px; font-size: 16px; font-weight: bold; }}
-        .btn:hover {{ background: #004d2e; }}
-        .warning {{ background: #fff3cd; border: 1px solid #ffc107; padding: 12px; border-radius: 5px; margin: 15px 0; font-size: 13px; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
-        .bismillah {{ text-align: center; color: #C9A227; font-size: 18px; margin-bottom: 10px; }}
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #006B3F, #004d2e); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border: 1px solid #ddd; }
+        .reset-box { background: #fff; border: 2px solid #C9A227; padding: 25px; text-align: center; margin: 20px 0; border-radius: 8px; }
+        .btn { display: inline-block; background: #006B3F; color: white; padding: 14px 40px; text-decoration: none; border-radius: 5px; font-size: 16px; font-weight: bold; }
+        .btn:hover { background: #004d2e; }
+        .warning { background: #fff3cd; border: 1px solid #ffc107; padding: 12px; border-radius: 5px; margin: 15px 0; font-size: 13px; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 12px; }
+        .bismillah { text-align: center; color: #C9A227; font-size: 18px; margin-bottom: 10px; }
     </style>
 </head>
 <body>
@@ -426,7 +285,7 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
 
             <div class="reset-box">
                 <p>Klik tombol di bawah untuk mereset password:</p>
-                <a href="{reset_url}" class="btn">Reset Password</a>
+                <a href="${reset_url}" class="btn">Reset Password</a>
                 <p style="color: #666; font-size: 12px; margin-top: 15px;">Link berlaku selama 1 jam</p>
             </div>
 
@@ -444,7 +303,351 @@ Email ini dikirim secara otomatis. Mohon tidak membalas email ini."""
     </div>
 </body>
 </html>
-"""
+""")
+
+
+
+# (to, subject, body_text, body_html)
+EmailMessage = Tuple[str, str, str, Optional[Union[str, bytes]]]
+
+
+class EmailService:
+    """Service for email integration using SMTP."""
+
+    # Authenticated SMTP connections kept open for reuse between sends
+    SMTP_POOL_SIZE = 2
+    SMTP_IDLE_TIMEOUT = 60  # seconds; older idle connections are closed
+
+    def __init__(self):
+        self.smtp_host = settings.smtp_host
+        self.smtp_port = settings.smtp_port
+        self.smtp_user = settings.smtp_user
+        self.smtp_password = settings.smtp_password
+        self.wbs_email = settings.wbs_email
+        self.enabled = bool(self.smtp_host and self.smtp_user and self.smtp_password)
+        self._from_header = formataddr(("WBS BPKH", self.wbs_email))
+        # Loads the system CA bundle from disk: build once, reuse per connection
+        self._ssl_context = ssl.create_default_context()
+        self._idle_connections: List[Tuple[smtplib.SMTP, float]] = []  # (conn, last used)
+        self._pool_lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        """Check if email service is properly configured."""
+        return self.enabled
+
+    def _create_message(
+        self,
+        to: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[Union[str, bytes]] = None
+    ) -> Union[MIMEText, MIMEMultipart]:
+        """Create email message (multipart only when there is an HTML part)."""
+        if body_html:
+            msg = MIMEMultipart("alternative")
+            msg.attach(MIMEText(body_text, "plain", "utf-8"))
+            msg.attach(self._html_part(body_html))
+        else:
+            msg = MIMEText(body_text, "plain", "utf-8")
+
+        msg["Subject"] = subject
+        msg["From"] = self._from_header
+        msg["To"] = to
+        return msg
+
+    @staticmethod
+    def _html_part(body_html: Union[str, bytes]) -> MIMENonMultipart:
+        """HTML part; pre-encoded UTF-8 bytes are used as-is."""
+        if isinstance(body_html, str):
+            body_html = body_html.encode("utf-8")
+        part = MIMENonMultipart("text", "html", charset="utf-8")
+        part.set_payload(body_html)
+        encoders.encode_base64(part)
+        return part
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open a new STARTTLS + authenticated SMTP connection."""
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        try:
+            server.starttls(context=self._ssl_context)
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            self._close_connection(server)
+            raise
+        return server
+
+    def _acquire_connection(self) -> smtplib.SMTP:
+        """Reuse a live idle connection if there is one, else connect."""
+        while True:
+            with self._pool_lock:
+                if not self._idle_connections:
+                    break
+                server, last_used = self._idle_connections.pop()
+            if time.monotonic() - last_used > self.SMTP_IDLE_TIMEOUT:
+                self._close_connection(server)
+                continue
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_connection(server)
+        return self._connect()
+
+    def _release_connection(self, server: smtplib.SMTP):
+        """Return a healthy connection to the pool (or close it if full)."""
+        with self._pool_lock:
+            if len(self._idle_connections) < self.SMTP_POOL_SIZE:
+                self._idle_connections.append((server, time.monotonic()))
+                return
+        self._close_connection(server)
+
+    @staticmethod
+    def _close_connection(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def close(self):
+        """Close all pooled SMTP connections."""
+        with self._pool_lock:
+            idle, self._idle_connections = self._idle_connections, []
+        for server, _ in idle:
+            self._close_connection(server)
+
+    def _send_sync(self, to: str, subject: str, body_text: str, body_html: Optional[Union[str, bytes]] = None) -> Dict[str, Any]:
+        """Synchronous email send with retry logic (runs in thread pool)."""
+        max_retries = 3
+        retry_delays = [2, 5, 10]  # seconds
+
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                msg = self._create_message(to, subject, body_text, body_html)
+
+                server = self._acquire_connection()
+                try:
+                    server.sendmail(self.wbs_email, to, msg.as_string())
+                except Exception as e:
+                    if self._session_usable(e):
+                        self._release_connection(server)
+                    else:
+                        # Connection state is unknown after a failure: don't reuse it
+                        self._close_connection(server)
+                    raise
+                self._release_connection(server)
+
+                logger.info(f"Email sent to {to[:5]}***")
+                return {"success": True}
+
+            except (smtplib.SMTPException, OSError) as e:
+                last_error = e
+                if self._is_permanent(e):
+                    logger.error(f"SMTP send rejected: {e}")
+                    return {"success": False, "error": str(e), "retryable": False}
+                if attempt < max_retries - 1:
+                    delay = retry_delays[attempt] * random.uniform(0.5, 1.5)  # jitter
+                    logger.warning(f"SMTP error (attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+                else:
+                    logger.error(f"SMTP error after {max_retries} attempts: {e}")
+            except Exception as e:
+                last_error = e
+                logger.error(f"Email send error: {e}")
+                break  # Other errors (e.g. message building) are not retryable
+
+        # Retries happen here only: an exhausted send is final for callers
+        return {"success": False, "error": str(last_error), "retryable": False}
+
+    @staticmethod
+    def _is_permanent(e: Exception) -> bool:
+        """5xx replies and refused recipients are permanent."""
+        return isinstance(e, smtplib.SMTPRecipientsRefused) or (
+            isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500
+        )
+
+    @staticmethod
+    def _session_usable(e: Exception) -> bool:
+        """Whether the connection survives a failed sendmail.
+
+        smtplib sends RSET after a refused recipient or a rejected
+        MAIL/DATA reply, so the session can be reused; 421 (closing) and
+        transport errors leave it in an unknown state.
+        """
+        return isinstance(e, smtplib.SMTPRecipientsRefused) or (
+            isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421
+        )
+
+    def _send_batch_sync(self, messages: List[EmailMessage]) -> List[Dict[str, Any]]:
+        """Send several messages over one SMTP session (runs in thread pool).
+
+        Saves the connect/STARTTLS/login round trips per message; each
+        command still waits for its reply (smtplib does not pipeline).
+        A rejected message leaves the session usable (see _session_usable);
+        only connection-level failures drop the connection. Permanent
+        rejections are final; other failures are retried on their own via
+        _send_sync.
+        """
+        results: List[Dict[str, Any]] = []
+        server = None
+        for to, subject, body_text, body_html in messages:
+            try:
+                msg = self._create_message(to, subject, body_text, body_html)
+                if server is None:
+                    server = self._acquire_connection()
+                server.sendmail(self.wbs_email, to, msg.as_string())
+                logger.info(f"Email sent to {to[:5]}***")
+                results.append({"success": True})
+                continue
+            except Exception as e:
+                if server is not None and not self._session_usable(e):
+                    self._close_connection(server)
+                    server = None
+                if self._is_permanent(e):
+                    logger.error(f"SMTP send rejected: {e}")
+                    results.append({"success": False, "error": str(e), "retryable": False})
+                    continue
+                logger.warning(f"Batched email to {to[:5]}*** failed, retrying alone: {e}")
+            results.append(self._send_sync(to, subject, body_text, body_html))
+        if server is not None:
+            self._release_connection(server)
+        return results
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[Dict[str, Any]]:
+        """
+        Send several emails over a single SMTP connection.
+
+        Args:
+            messages: (to, subject, body_text, body_html) tuples
+
+        Returns:
+            One response dict per message, in order
+        """
+        if not self.is_configured():
+            logger.warning("Email service not configured, skipping send")
+            return [{"success": False, "error": "Email not configured"} for _ in messages]
+        if not messages:
+            return []
+
+        return await asyncio.to_thread(self._send_batch_sync, messages)
+
+    async def aclose(self):
+        """Close pooled SMTP connections (app shutdown)."""
+        self.close()
+
+    async def send_email(
+        self,
+        to: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[Union[str, bytes]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send an email asynchronously.
+
+        Args:
+            to: Recipient email address
+            subject: Email subject
+            body_text: Plain text body
+            body_html: Optional HTML body (str or UTF-8 bytes)
+
+        Returns:
+            Response dict with success status
+        """
+        if not self.is_configured():
+            logger.warning("Email service not configured, skipping send")
+            return {"success": False, "error": "Email not configured"}
+
+        return await asyncio.to_thread(self._send_sync, to, subject, body_text, body_html)
+
+    async def send_report_confirmation(
+        self,
+        to: str,
+        ticket_id: str
+    ) -> Dict[str, Any]:
+        """Send report submission confirmation email."""
+        return await self.send_email(*self.render_report_confirmation(to, ticket_id))
+
+    @staticmethod
+    def render_report_confirmation(to: str, ticket_id: str) -> EmailMessage:
+        """Build the report confirmation email without sending it."""
+        subject = f"[WBS BPKH] Laporan Diterima - Tiket #{ticket_id}"
+
+        body_text = _CONFIRMATION_TEXT.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
+
+        body_html = _CONFIRMATION_HTML.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
+
+        return to, subject, body_text, body_html
+
+    async def send_status_update(
+        self,
+        to: str,
+        ticket_id: str,
+        old_status: str,
+        new_status: str,
+        note: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send status update notification email."""
+        return await self.send_email(*self.render_status_update(to, ticket_id, new_status, note))
+
+    @staticmethod
+    def render_status_update(
+        to: str,
+        ticket_id: str,
+        new_status: str,
+        note: Optional[str] = None
+    ) -> EmailMessage:
+        """Build the status update email without sending it."""
+        new_label = REPORTER_STATUS_LABELS.get(new_status, new_status)
+        subject = f"[WBS BPKH] Update Status - Tiket #{ticket_id}"
+
+        note_text = f"\n\nCatatan:\n{note}" if note else ""
+
+        body_text = _STATUS_UPDATE_TEXT.substitute(
+            ticket_id=ticket_id, new_label=new_label, note_text=note_text,
+            portal_url=_PORTAL_URL
+        )
+
+        note_html = f'<div style="background: #f5f5f5; padding: 15px; border-left: 4px solid #C9A227; margin: 15px 0;"><strong>Catatan:</strong><br>{html.escape(note)}</div>' if note else ""
+
+        body_html = _STATUS_UPDATE_HTML.substitute(
+            ticket_id=ticket_id, new_label=new_label, note_html=note_html,
+            portal_url=_PORTAL_URL
+        )
+
+        return to, subject, body_text, body_html
+
+    async def send_new_message_notification(
+        self,
+        to: str,
+        ticket_id: str
+    ) -> Dict[str, Any]:
+        """Notify reporter about new admin message."""
+        return await self.send_email(*self.render_new_message_notification(to, ticket_id))
+
+    @staticmethod
+    def render_new_message_notification(to: str, ticket_id: str) -> EmailMessage:
+        """Build the new message email without sending it."""
+        subject = f"[WBS BPKH] Pesan Baru - Tiket #{ticket_id}"
+
+        body_text = _NEW_MESSAGE_TEXT.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
+
+        body_html = _NEW_MESSAGE_HTML.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
+
+        return to, subject, body_text, body_html
+
+    async def send_password_reset(
+        self,
+        to: str,
+        reset_url: str
+    ) -> Dict[str, Any]:
+        """Send password reset email with reset link."""
+        subject = "[WBS BPKH] Reset Password"
+
+        body_text = _PASSWORD_RESET_TEXT.substitute(reset_url=reset_url)
+
+        body_html = _PASSWORD_RESET_HTML.substitute(reset_url=reset_url)
 
         return await self.send_email(to, subject, body_text, body_html)
 
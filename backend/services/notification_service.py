@@ -4,10 +4,18 @@ WBS BPKH AI - Notification Service
 Coordinates notifications via WhatsApp and Email channels.
 """
 
-from typing import Optional, Dict, Any, List
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Awaitable, Callable, Tuple
 from loguru import logger
 from enum import Enum
 
+from batching import collect_batch
 from .whatsapp_service import whatsapp_service
 from .email_service import email_service
 
@@ -19,39 +27,301 @@ class NotificationChannel(str, Enum):
     BOTH = "both"
 
 
+_WA_CHANNELS = frozenset({NotificationChannel.WHATSAPP, NotificationChannel.BOTH})
+_EMAIL_CHANNELS = frozenset({NotificationChannel.EMAIL, NotificationChannel.BOTH})
+
+
+@dataclass(slots=True)
+class NotificationJob:
+    """A queued call to one of the NotificationService send_* methods."""
+    method: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    attempt: int = 0
+
+
 class NotificationService:
     """
     Unified notification service that handles sending notifications
     through multiple channels (WhatsApp, Email).
     """
 
+    # Sends submitted within BATCH_WINDOW are flushed together: WhatsApp
+    # messages concurrently over the pooled client, emails on one SMTP session
+    BATCH_WINDOW = 0.05  # seconds
+    BATCH_MAX_SIZE = 32
+
+    # A notification that succeeded is not re-sent to the same recipient
+    # for the same event within this window (outbox retries would otherwise
+    # repeat channels that already went out); status changes and message
+    # notices carry a per-event id, so distinct events never collide
+    IDEMPOTENCY_TTL = 300  # seconds
+    IDEMPOTENCY_MAX_ENTRIES = 10000
+
+    # Fire-and-forget outbox: queue_* calls return immediately and a worker
+    # performs the sends. Providers retry their own failures, so the outbox
+    # only retries (with exponential backoff) sends that raised before a
+    # provider returned a result
+    OUTBOX_MAX_SIZE = 10000
+    OUTBOX_CONCURRENCY = 64
+    OUTBOX_MAX_ATTEMPTS = 4
+    OUTBOX_RETRY_BASE = 2.0  # seconds, doubled per attempt
+
     def __init__(self):
         self.whatsapp = whatsapp_service
         self.email = email_service
+        # Channel configuration is fixed at startup
+        self._wa_on = self.whatsapp.is_configured()
+        self._em_on = self.email.is_configured()
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # key -> (sent_at, result); only touched from the event loop, no lock needed
+        self._sent: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._jobs: set = set()
+        # Backoff timers of jobs waiting to be re-queued, by id(job)
+        self._retry_timers: Dict[int, asyncio.TimerHandle] = {}
+
+    def start(self):
+        """Start the outbox worker; call once the event loop is running."""
+        if self._outbox is None:
+            self._outbox = asyncio.Queue(maxsize=self.OUTBOX_MAX_SIZE)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run_worker())
+
+    async def aclose(self, timeout: float = 10.0):
+        """Let queued notifications go out (up to timeout), then stop the worker."""
+        if self._outbox is not None:
+            try:
+                await asyncio.wait_for(self._outbox.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._outbox.qsize()} queued notifications on shutdown")
+        # Jobs still in backoff are not counted by join(): cancel them explicitly
+        if self._retry_timers:
+            logger.warning(f"Dropping {len(self._retry_timers)} pending notification retries on shutdown")
+            for handle in self._retry_timers.values():
+                handle.cancel()
+            self._retry_timers.clear()
+        for task in (self._worker, self._flusher):
+            if task is not None:
+                task.cancel()
+
+    def enqueue(self, method: str, **kwargs) -> Dict[str, Any]:
+        """Queue a send_* call for the outbox worker and return at once."""
+        self.start()
+        try:
+            self._outbox.put_nowait(NotificationJob(method, kwargs))
+        except asyncio.QueueFull:
+            logger.error(f"Notification outbox full, dropping {method} for ticket {kwargs.get('ticket_id')}")
+            return {"queued": False, "error": "Notification queue full"}
+        return {"queued": True}
+
+    def queue_report_confirmation(self, **kwargs) -> Dict[str, Any]:
+        """Fire-and-forget send_report_confirmation."""
+        return self.enqueue("send_report_confirmation", **kwargs)
+
+    def queue_status_update(self, **kwargs) -> Dict[str, Any]:
+        """Fire-and-forget send_status_update."""
+        # One id per status change, kept in the job so outbox retries reuse it
+        kwargs.setdefault("event_id", uuid.uuid4().hex)
+        return self.enqueue("send_status_update", **kwargs)
+
+    def queue_new_message_notification(self, **kwargs) -> Dict[str, Any]:
+        """Fire-and-forget send_new_message_notification."""
+        kwargs.setdefault("event_id", uuid.uuid4().hex)
+        return self.enqueue("send_new_message_notification", **kwargs)
+
+    async def _run_worker(self):
+        # Jobs run concurrently (up to OUTBOX_CONCURRENCY) so their sends
+        # share batches in _flush_loop instead of going out one by one
+        outbox = self._outbox
+        slots = asyncio.Semaphore(self.OUTBOX_CONCURRENCY)
+        while True:
+            await slots.acquire()
+            job = await outbox.get()
+            task = asyncio.create_task(self._run_job(job))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+            task.add_done_callback(lambda _: (slots.release(), outbox.task_done()))
+
+    async def _run_job(self, job: NotificationJob):
+        try:
+            results = await getattr(self, job.method)(**job.kwargs)
+        except Exception as e:
+            logger.error(f"Notification job {job.method} failed: {e}")
+            self._schedule_retry(job)
+            return
+        # Channels that already succeeded are skipped on retry (idempotency cache)
+        if any(
+            isinstance(r, dict) and not r.get("success") and r.get("retryable")
+            for r in results.values()
+        ):
+            self._schedule_retry(job)
+
+    def _schedule_retry(self, job: NotificationJob):
+        job.attempt += 1
+        if job.attempt >= self.OUTBOX_MAX_ATTEMPTS:
+            logger.error(f"Giving up on {job.method} for ticket {job.kwargs.get('ticket_id')} after {job.attempt} attempts")
+            return
+        delay = self.OUTBOX_RETRY_BASE * 2 ** (job.attempt - 1) * random.uniform(0.5, 1.5)
+        logger.warning(f"Retrying {job.method} for ticket {job.kwargs.get('ticket_id')} in {delay:.1f}s")
+        self._retry_timers[id(job)] = asyncio.get_running_loop().call_later(delay, self._requeue, job)
+
+    def _requeue(self, job: NotificationJob):
+        self._retry_timers.pop(id(job), None)
+        try:
+            self._outbox.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.error(f"Notification outbox full, dropping retry of {job.method}")
+
+    @staticmethod
+    def _idempotency_key(channel: str, kind: str, ticket_id: str, to: str, detail: str = "") -> bytes:
+        raw = f"{channel}|{ticket_id}|{kind}|{detail}|{to}".encode()
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def _recently_sent(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._sent.get(key)
+        if entry is None:
+            return None
+        sent_at, result = entry
+        if time.monotonic() - sent_at > self.IDEMPOTENCY_TTL:
+            del self._sent[key]
+            return None
+        return result
+
+    def _remember(self, key: bytes, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if not (isinstance(result, dict) and result.get("success")):
+            return
+        self._sent[key] = (time.monotonic(), result)
+        self._sent.move_to_end(key)
+        while len(self._sent) > self.IDEMPOTENCY_MAX_ENTRIES:
+            self._sent.popitem(last=False)
+
+    def _send_once(
+        self,
+        results: Dict[str, Any],
+        pending: Dict[str, Awaitable],
+        channel: str,
+        key: bytes,
+        render: Callable[[], tuple],
+    ):
+        """Submit a rendered message unless it was already delivered recently."""
+        cached = self._recently_sent(key)
+        if cached is not None:
+            logger.info("Skipping duplicate {} notification", channel)
+            results[channel] = cached
+            return
+        future = self._submit(channel, render())
+        future.add_done_callback(lambda f: self._remember(key, f))
+        pending[channel] = future
+
+    def _submit(self, channel: str, message: tuple) -> asyncio.Future:
+        """Queue a rendered message for the batch flusher; resolves to its result."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((channel, message, future))
+        return future
+
+    async def _flush_loop(self):
+        # Each batch is sent in its own task so a slow provider (e.g. SMTP
+        # retries) doesn't hold up the batches queued behind it
+        in_flight = set()
+        while True:
+            batch = await collect_batch(self._queue, self.BATCH_MAX_SIZE, self.BATCH_WINDOW)
+            task = asyncio.create_task(self._flush(batch))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+    async def _flush(self, batch: List[tuple]):
+        groups = {
+            "whatsapp": [item for item in batch if item[0] == "whatsapp"],
+            "email": [item for item in batch if item[0] == "email"],
+        }
+        senders = {"whatsapp": self.whatsapp.send_batch, "email": self.email.send_batch}
+        keys = [key for key in groups if groups[key]]
+        done = await asyncio.gather(
+            *(senders[key]([message for _, message, _ in groups[key]]) for key in keys),
+            return_exceptions=True,
+        )
+        for key, outcome in zip(keys, done):
+            for i, (_, _, future) in enumerate(groups[key]):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome[i])
 
     def get_available_channels(self) -> List[str]:
         """Get list of configured notification channels."""
         channels = []
-        if self.whatsapp.is_configured():
+        if self._wa_on:
             channels.append("whatsapp")
-        if self.email.is_configured():
+        if self._em_on:
             channels.append("email")
         return channels
 
     def get_status(self) -> Dict[str, Any]:
         """Get status of all notification channels."""
+        wa_on, em_on = self._wa_on, self._em_on
         return {
             "whatsapp": {
-                "configured": self.whatsapp.is_configured(),
-                "primary_number": self.whatsapp.primary_number if self.whatsapp.is_configured() else None,
-                "backup_number": self.whatsapp.backup_number if self.whatsapp.is_configured() else None,
+                "configured": wa_on,
+                "primary_number": self.whatsapp.primary_number if wa_on else None,
+                "backup_number": self.whatsapp.backup_number if wa_on else None,
             },
             "email": {
-                "configured": self.email.is_configured(),
-                "wbs_email": self.email.wbs_email if self.email.is_configured() else None,
+                "configured": em_on,
+                "wbs_email": self.email.wbs_email if em_on else None,
             }
         }
 
+    def _preflight(
+        self,
+        channel: NotificationChannel,
+        reporter_phone: Optional[str],
+        reporter_email: Optional[str],
+    ) -> Tuple[Dict[str, Any], bool, bool]:
+        """Decide once which channels to send on.
+
+        A requested channel whose provider is not configured is reported in
+        results (marked non-retryable) instead of being sent.
+        """
+        results: Dict[str, Any] = {"whatsapp": None, "email": None}
+        do_wa = bool(reporter_phone) and channel in _WA_CHANNELS
+        do_email = bool(reporter_email) and channel in _EMAIL_CHANNELS
+        if do_wa and not self._wa_on:
+            results["whatsapp"] = {"success": False, "error": "WhatsApp not configured", "retryable": False}
+            do_wa = False
+        if do_email and not self._em_on:
+            results["email"] = {"success": False, "error": "Email not configured", "retryable": False}
+            do_email = False
+        return results, do_wa, do_email
+
+    @staticmethod
+    async def _gather(results: Dict[str, Any], pending: Dict[str, Awaitable]) -> Dict[str, Any]:
+        """Run the per-channel sends concurrently and merge them into results.
+
+        A failure in one channel is recorded for that channel only and does
+        not cancel the other send.
+        """
+        if pending:
+            done = await asyncio.gather(*pending.values(), return_exceptions=True)
+            for key, outcome in zip(pending, done):
+                if isinstance(outcome, Exception):
+                    # No provider result (and so no provider retries): the outbox may retry
+                    logger.error(f"{key} notification error: {outcome}")
+                    outcome = {"success": False, "error": str(outcome), "retryable": True}
+                results[key] = outcome
+        return results
+
     async def send_report_confirmation(
         self,
         ticket_id: str,
@@ -71,32 +341,29 @@ class NotificationService:
         Returns:
             Result dict with status for each channel
         """
-        results = {
-            "whatsapp": None,
-            "email": None
-        }
+        results, do_wa, do_email = self._preflight(channel, reporter_phone, reporter_email)
+        pending: Dict[str, Awaitable] = {}
 
         # Send via WhatsApp
-        if reporter_phone and channel in [NotificationChannel.WHATSAPP, NotificationChannel.BOTH]:
-            if self.whatsapp.is_configured():
-                results["whatsapp"] = await self.whatsapp.send_report_confirmation(
-                    to=reporter_phone,
-                    ticket_id=ticket_id
-                )
-            else:
-                results["whatsapp"] = {"success": False, "error": "WhatsApp not configured"}
+        if do_wa:
+            self._send_once(
+                results, pending, "whatsapp",
+                self._idempotency_key("whatsapp", "confirmation", ticket_id, reporter_phone),
+                lambda: (reporter_phone, self.whatsapp.render_report_confirmation(ticket_id)),
+            )
 
         # Send via Email
-        if reporter_email and channel in [NotificationChannel.EMAIL, NotificationChannel.BOTH]:
-            if self.email.is_configured():
-                results["email"] = await self.email.send_report_confirmation(
-                    to=reporter_email,
-                    ticket_id=ticket_id
-                )
-            else:
-                results["email"] = {"success": False, "error": "Email not configured"}
-
-        logger.info(f"Report confirmation sent for ticket {ticket_id}: WA={results['whatsapp']}, Email={results['email']}")
+        if do_email:
+            self._send_once(
+                results, pending, "email",
+                self._idempotency_key("email", "confirmation", ticket_id, reporter_email),
+                lambda: self.email.render_report_confirmation(reporter_email, ticket_id),
+            )
+
+        await self._gather(results, pending)
+
+        # Placeholder args: the result reprs are only built if INFO is emitted
+        logger.info("Report confirmation sent for ticket {}: WA={}, Email={}", ticket_id, results["whatsapp"], results["email"])
         return results
 
     async def send_status_update(
@@ -107,7 +374,8 @@ class NotificationService:
         reporter_phone: Optional[str] = None,
         reporter_email: Optional[str] = None,
         note: Optional[str] = None,
-        channel: NotificationChannel = NotificationChannel.BOTH
+        channel: NotificationChannel = NotificationChannel.BOTH,
+        event_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Send status update notification via configured channels.
@@ -120,42 +388,36 @@ class NotificationService:
             reporter_email: Reporter's email address
             note: Optional note to include
             channel: Which channel(s) to use
+            event_id: Identifies this status change; a send with the same id
+                is not repeated (set by queue_status_update; a fresh id is
+                used when omitted)
 
         Returns:
             Result dict with status for each channel
         """
-        results = {
-            "whatsapp": None,
-            "email": None
-        }
+        event_id = event_id or uuid.uuid4().hex
+        results, do_wa, do_email = self._preflight(channel, reporter_phone, reporter_email)
+        pending: Dict[str, Awaitable] = {}
 
         # Send via WhatsApp
-        if reporter_phone and channel in [NotificationChannel.WHATSAPP, NotificationChannel.BOTH]:
-            if self.whatsapp.is_configured():
-                results["whatsapp"] = await self.whatsapp.send_status_update(
-                    to=reporter_phone,
-                    ticket_id=ticket_id,
-                    old_status=old_status,
-                    new_status=new_status,
-                    note=note
-                )
-            else:
-                results["whatsapp"] = {"success": False, "error": "WhatsApp not configured"}
+        if do_wa:
+            self._send_once(
+                results, pending, "whatsapp",
+                self._idempotency_key("whatsapp", "status", ticket_id, reporter_phone, event_id),
+                lambda: (reporter_phone, self.whatsapp.render_status_update(ticket_id, new_status, note)),
+            )
 
         # Send via Email
-        if reporter_email and channel in [NotificationChannel.EMAIL, NotificationChannel.BOTH]:
-            if self.email.is_configured():
-                results["email"] = await self.email.send_status_update(
-                    to=reporter_email,
-                    ticket_id=ticket_id,
-                    old_status=old_status,
-                    new_status=new_status,
-                    note=note
-                )
-            else:
-                results["email"] = {"success": False, "error": "Email not configured"}
-
-        logger.info(f"Status update sent for ticket {ticket_id}: {old_status} -> {new_status}")
+        if do_email:
+            self._send_once(
+                results, pending, "email",
+                self._idempotency_key("email", "status", ticket_id, reporter_email, event_id),
+                lambda: self.email.render_status_update(reporter_email, ticket_id, new_status, note),
+            )
+
+        await self._gather(results, pending)
+
+        logger.info("Status update sent for ticket {}: {} -> {}", ticket_id, old_status, new_status)
         return results
 
     async def send_new_message_notification(
@@ -163,7 +425,8 @@ class NotificationService:
         ticket_id: str,
         reporter_phone: Optional[str] = None,
         reporter_email: Optional[str] = None,
-        channel: NotificationChannel = NotificationChannel.BOTH
+        channel: NotificationChannel = NotificationChannel.BOTH,
+        event_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Notify reporter about new admin message.
@@ -173,36 +436,36 @@ class NotificationService:
             reporter_phone: Reporter's phone number
             reporter_email: Reporter's email address
             channel: Which channel(s) to use
+            event_id: Identifies this message notice; a send with the same
+                id is not repeated (set by queue_new_message_notification;
+                a fresh id is used when omitted)
 
         Returns:
             Result dict with status for each channel
         """
-        results = {
-            "whatsapp": None,
-            "email": None
-        }
+        event_id = event_id or uuid.uuid4().hex
+        results, do_wa, do_email = self._preflight(channel, reporter_phone, reporter_email)
+        pending: Dict[str, Awaitable] = {}
 
         # Send via WhatsApp
-        if reporter_phone and channel in [NotificationChannel.WHATSAPP, NotificationChannel.BOTH]:
-            if self.whatsapp.is_configured():
-                results["whatsapp"] = await self.whatsapp.send_new_message_notification(
-                    to=reporter_phone,
-                    ticket_id=ticket_id
-                )
-            else:
-                results["whatsapp"] = {"success": False, "error": "WhatsApp not configured"}
+        if do_wa:
+            self._send_once(
+                results, pending, "whatsapp",
+                self._idempotency_key("whatsapp", "new_message", ticket_id, reporter_phone, event_id),
+                lambda: (reporter_phone, self.whatsapp.render_new_message_notification(ticket_id)),
+            )
 
         # Send via Email
-        if reporter_email and channel in [NotificationChannel.EMAIL, NotificationChannel.BOTH]:
-            if self.email.is_configured():
-                results["email"] = await self.email.send_new_message_notification(
-                    to=reporter_email,
-                    ticket_id=ticket_id
-                )
-            else:
-                results["email"] = {"success": False, "error": "Email not configured"}
-
-        logger.info(f"New message notification sent for ticket {ticket_id}")
+        if do_email:
+            self._send_once(
+                results, pending, "email",
+                self._idempotency_key("email", "new_message", ticket_id, reporter_email, event_id),
+                lambda: self.email.render_new_message_notification(reporter_email, ticket_id),
+            )
+
+        await self._gather(results, pending)
+
+        logger.info("New message notification sent for ticket {}", ticket_id)
         return results
 
 
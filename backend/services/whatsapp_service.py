@@ -4,17 +4,73 @@ WBS BPKH AI - WhatsApp Service (WAHA Integration)
 Handles WhatsApp message sending/receiving via WAHA API.
 """
 
+import asyncio
+import random
 import httpx
-from typing import Optional, Dict, Any, List
+import orjson
+from typing import Optional, Dict, Any, List, Tuple
 from loguru import logger
 from datetime import datetime
+from string import Template
 
-from config import settings
+from config import settings, REPORTER_STATUS_LABELS
+
+# ============== Templates ==============
+# Parsed once at import; per-send work is a single substitute()
+
+_PORTAL_URL = settings.wbs_portal_url
+
+_CONFIRMATION_TEXT = Template("""Assalamu'alaikum Wr. Wb.
+
+Laporan Anda telah kami terima.
+
+*ID Tiket: ${ticket_id}*
+
+Simpan ID tiket ini untuk memantau status laporan Anda di:
+${portal_url}
+
+Kami akan memproses laporan Anda sesuai prosedur yang berlaku. Identitas Anda dijamin kerahasiaannya.
+
+Wassalamu'alaikum Wr. Wb.
+_Tim WBS BPKH_""")
+
+_STATUS_UPDATE_TEXT = Template("""Assalamu'alaikum Wr. Wb.
+
+*Update Status Laporan*
+ID Tiket: ${ticket_id}
+
+Status baru: *${new_label}*${note_text}
+
+Pantau perkembangan di:
+${portal_url}
+
+_Tim WBS BPKH_""")
+
+_NEW_MESSAGE_TEXT = Template("""Assalamu'alaikum Wr. Wb.
+
+Ada pesan baru untuk laporan Anda.
+
+ID Tiket: ${ticket_id}
+
+Silakan cek pesan di:
+${portal_url}
+
+_Tim WBS BPKH_""")
+
+# ASCII non-digits, deleted with bytes.translate (benchmarked faster than
+# str.translate, re.sub(r"\D") and filter(str.isdigit) on phone-sized input)
+_NON_DIGIT_BYTES = bytes(c for c in range(128) if not 0x30 <= c <= 0x39)
 
 
 class WhatsAppService:
     """Service for WhatsApp integration using WAHA (WhatsApp HTTP API)."""
 
+    # Transient WAHA failures (5xx, 429, connection errors) are retried with
+    # exponential backoff plus jitter; other 4xx responses are final
+    SEND_MAX_ATTEMPTS = 4
+    RETRY_INITIAL_DELAY = 0.5  # seconds, doubled per attempt
+    RETRY_MAX_DELAY = 8.0
+
     def __init__(self):
         self.api_url = settings.waha_api_url
         self.api_key = settings.waha_api_key
@@ -22,10 +78,38 @@ class WhatsAppService:
         self.primary_number = settings.waha_number_primary
         self.backup_number = settings.waha_number_backup
         self.enabled = bool(self.api_url)
+        self._configured = self.enabled and bool(self.api_url)  # fixed at startup
+        # One pooled client for all WAHA calls: keeps connections alive between sends
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url or "",
+            headers=self._get_headers(),
+            timeout=30.0,
+            # Long keep-alive so sparse notifications still reuse a warm connection
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300),
+        )
+        self._warmup: Optional[asyncio.Task] = None
+
+    def warm_up(self):
+        """Open a pooled WAHA connection in the background; call on startup.
+
+        The first notification then skips DNS lookup and connection setup.
+        """
+        if self.is_configured() and self._warmup is None:
+            self._warmup = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self):
+        status = await self.check_session_status()
+        logger.info(f"WAHA session '{self.session}' status: {status.get('status')}")
+
+    async def aclose(self):
+        """Close pooled WAHA connections."""
+        if self._warmup is not None:
+            self._warmup.cancel()
+        await self._client.aclose()
 
     def is_configured(self) -> bool:
         """Check if WhatsApp service is properly configured."""
-        return self.enabled and bool(self.api_url)
+        return self._configured
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with API key if configured."""
@@ -36,8 +120,13 @@ class WhatsAppService:
 
     def _format_phone(self, phone: str) -> str:
         """Format phone number for WhatsApp (remove +, spaces, etc.)."""
-        # Remove all non-digit characters
-        cleaned = ''.join(filter(str.isdigit, phone))
+        # Remove all non-digit characters (already-clean numbers skip this)
+        cleaned = phone
+        if not cleaned.isdigit():
+            if cleaned.isascii():
+                cleaned = cleaned.encode("ascii").translate(None, _NON_DIGIT_BYTES).decode("ascii")
+            else:
+                cleaned = ''.join(filter(str.isdigit, cleaned))
         # Ensure it starts with country code
         if cleaned.startswith('0'):
             cleaned = '62' + cleaned[1:]  # Indonesia
@@ -67,36 +156,58 @@ class WhatsAppService:
             logger.warning("WhatsApp service not configured, skipping send")
             return {"success": False, "error": "WhatsApp not configured"}
 
-        try:
-            chat_id = self._format_phone(to)
-
-            payload = {
-                "chatId": chat_id,
-                "text": message,
-                "session": self.session
-            }
-
-            if reply_to:
-                payload["reply_to"] = reply_to
-
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.api_url}/api/sendText",
-                    json=payload,
-                    headers=self._get_headers()
-                )
+        chat_id = self._format_phone(to)
+
+        payload = {
+            "chatId": chat_id,
+            "text": message,
+            "session": self.session
+        }
+
+        if reply_to:
+            payload["reply_to"] = reply_to
+
+        body = orjson.dumps(payload)
+        last_error = None
+        for attempt in range(self.SEND_MAX_ATTEMPTS):
+            try:
+                # Client default headers already set Content-Type: application/json
+                response = await self._client.post("/api/sendText", content=body)
                 response.raise_for_status()
-                result = response.json()
+                result = orjson.loads(response.content)
 
                 logger.info(f"WhatsApp message sent to {to[:8]}***")
                 return {"success": True, "data": result}
 
-        except httpx.HTTPError as e:
-            logger.error(f"WhatsApp send error: {e}")
-            return {"success": False, "error": str(e)}
-        except Exception as e:
-            logger.error(f"WhatsApp send error: {e}")
-            return {"success": False, "error": str(e)}
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                code = e.response.status_code
+                if code < 500 and code != 429:
+                    logger.error(f"WhatsApp send rejected: {e}")
+                    return {"success": False, "error": str(e), "retryable": False}
+            except httpx.TransportError as e:
+                last_error = e
+            except Exception as e:
+                logger.error(f"WhatsApp send error: {e}")
+                return {"success": False, "error": str(e), "retryable": False}
+
+            if attempt < self.SEND_MAX_ATTEMPTS - 1:
+                delay = min(self.RETRY_MAX_DELAY, self.RETRY_INITIAL_DELAY * 2 ** attempt + random.uniform(0, self.RETRY_INITIAL_DELAY))
+                logger.warning(f"WhatsApp send error (attempt {attempt + 1}/{self.SEND_MAX_ATTEMPTS}), retrying in {delay:.1f}s: {last_error}")
+                await asyncio.sleep(delay)
+
+        # Retries happen here only: an exhausted send is final for callers
+        logger.error(f"WhatsApp send error after {self.SEND_MAX_ATTEMPTS} attempts: {last_error}")
+        return {"success": False, "error": str(last_error), "retryable": False}
+
+    async def send_batch(self, messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Send several (to, message) pairs concurrently over the pooled client.
+
+        WAHA has no multi-message endpoint, so a batch is concurrent
+        sendText calls sharing keep-alive connections.
+        """
+        return await asyncio.gather(*(self.send_message(to, message) for to, message in messages))
 
     async def send_report_confirmation(
         self,
@@ -104,21 +215,12 @@ class WhatsAppService:
         ticket_id: str
     ) -> Dict[str, Any]:
         """Send report submission confirmation."""
-        message = f"""Assalamu'alaikum Wr. Wb.
-
-Laporan Anda telah kami terima.
+        return await self.send_message(to, self.render_report_confirmation(ticket_id))
 
-*ID Tiket: {ticket_id}*
-
-Simpan ID tiket ini untuk memantau status laporan Anda di:
-{settings.wbs_portal_url}
-
-Kami akan memproses laporan Anda sesuai prosedur yang berlaku. Identitas Anda dijamin kerahasiaannya.
-
-Wassalamu'alaikum Wr. Wb.
-_Tim WBS BPKH_"""
-
-        return await self.send_message(to, message)
+    @staticmethod
+    def render_report_confirmation(ticket_id: str) -> str:
+        """Build the report confirmation text without sending it."""
+        return _CONFIRMATION_TEXT.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
 
     async def send_status_update(
         self,
@@ -129,38 +231,17 @@ _Tim WBS BPKH_"""
         note: Optional[str] = None
     ) -> Dict[str, Any]:
         """Send status update notification."""
-        status_labels = {
-            "NEW": "Diterima",
-            "REVIEWING": "Sedang Ditinjau",
-            "NEED_INFO": "Butuh Informasi Tambahan",
-            "INVESTIGATING": "Dalam Investigasi",
-            "HOLD": "Ditangguhkan",
-            "ESCALATED": "Dieskalasi",
-            "CLOSED_PROVEN": "Selesai - Terbukti",
-            "CLOSED_NOT_PROVEN": "Selesai - Tidak Terbukti",
-            "CLOSED_INVALID": "Ditutup - Tidak Valid"
-        }
-
-        new_label = status_labels.get(new_status, new_status)
-
-        message = f"""Assalamu'alaikum Wr. Wb.
-
-*Update Status Laporan*
-ID Tiket: {ticket_id}
-
-Status baru: *{new_label}*"""
-
-        if note:
-            message += f"\n\nCatatan:\n{note}"
-
-        message += f"""
-
-Pantau perkembangan di:
-{settings.wbs_portal_url}
-
-_Tim WBS BPKH_"""
-
-        return await self.send_message(to, message)
+        return await self.send_message(to, self.render_status_update(ticket_id, new_status, note))
+
+    @staticmethod
+    def render_status_update(ticket_id: str, new_status: str, note: Optional[str] = None) -> str:
+        """Build the status update text without sending it."""
+        new_label = REPORTER_STATUS_LABELS.get(new_status, new_status)
+        note_text = f"\n\nCatatan:\n{note}" if note else ""
+        return _STATUS_UPDATE_TEXT.substitute(
+            ticket_id=ticket_id, new_label=new_label, note_text=note_text,
+            portal_url=_PORTAL_URL
+        )
 
     async def send_new_message_notification(
         self,
@@ -168,18 +249,12 @@ _Tim WBS BPKH_"""
         ticket_id: str
     ) -> Dict[str, Any]:
         """Notify reporter about new admin message."""
-        message = f"""Assalamu'alaikum Wr. Wb.
-
-Ada pesan baru untuk laporan Anda.
-
-ID Tiket: {ticket_id}
+        return await self.send_message(to, self.render_new_message_notification(ticket_id))
 
-Silakan cek pesan di:
-{settings.wbs_portal_url}
-
-_Tim WBS BPKH_"""
-
-        return await self.send_message(to, message)
+    @staticmethod
+    def render_new_message_notification(ticket_id: str) -> str:
+        """Build the new message text without sending it."""
+        return _NEW_MESSAGE_TEXT.substitute(ticket_id=ticket_id, portal_url=_PORTAL_URL)
 
     async def check_session_status(self) -> Dict[str, Any]:
         """Check WAHA session status."""
@@ -187,13 +262,9 @@ _Tim WBS BPKH_"""
             return {"status": "not_configured"}
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.api_url}/api/sessions/{self.session}",
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._client.get(f"/api/sessions/{self.session}", timeout=10.0)
+            response.raise_for_status()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"WhatsApp session check error: {e}")
             return {"status": "error", "error": str(e)}
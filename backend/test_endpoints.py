@@ -3,11 +3,17 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import time
 
 BASE = 'http://localhost:8000'
+LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
+# One pooled client for the sequential tests (keep-alive instead of a new
+# connection per request)
+client = httpx.Client(base_url=BASE, limits=LIMITS, timeout=30.0)
 
 def h(token):
     return {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
@@ -25,27 +31,42 @@ print("=" * 60)
 
 # Login
 print("\n--- Authentication ---")
-r = requests.post(f'{BASE}/api/v1/auth/login', json={'email':'admin@bpkh.go.id','password':'Admin123!'})
+r = client.post('/api/v1/auth/login', json={'email':'admin@bpkh.go.id','password':'Admin123!'})
 test("Login", r.status_code == 200, f"status={r.status_code}")
-data = r.json()
+data = orjson.loads(r.content)
 token = data.get('access_token', '')
 user_id = data.get('user', {}).get('id', '')
 headers = h(token)
 
+
+async def fetch_independent():
+    """Issue the read-only Phase 1 requests concurrently."""
+    async with httpx.AsyncClient(base_url=BASE, headers=headers, limits=LIMITS, timeout=30.0) as c:
+        return await asyncio.gather(
+            c.get('/health'),
+            c.get('/api/v1/dashboard/stats'),
+            c.get('/api/v1/reference/statuses'),
+            c.get('/api/v1/reports?page=1&per_page=2'),
+            c.get('/api/v1/reports?search=penyimpangan'),
+            c.get('/api/v1/reports?category=FRAUD'),
+        )
+
+r_health, r_stats, r_statuses, r_page1, r_search, r_category = asyncio.run(fetch_independent())
+
 # 1. Health Check
 print("\n--- Phase 1: Bug Fixes & Hardening ---")
-r = requests.get(f'{BASE}/health')
-d = r.json()
+r = r_health
+d = orjson.loads(r.content)
 test("Health Check (real DB check)", d['components']['database'] == 'ok', f"db={d['components']['database']}")
 
 # 2. Dashboard Stats (SLA fix)
-r = requests.get(f'{BASE}/api/v1/dashboard/stats', headers=headers)
-d = r.json()
+r = r_stats
+d = orjson.loads(r.content)
 test("Dashboard Stats", r.status_code == 200, f"total={d['total_reports']} sla_at_risk={d['sla_at_risk']}")
 
 # 3. Reference Statuses (NEW not NEW_WEB)
-r = requests.get(f'{BASE}/api/v1/reference/statuses', headers=headers)
-d = r.json()
+r = r_statuses
+d = orjson.loads(r.content)
 has_new = 'NEW' in d
 no_new_web = 'NEW_WEB' not in d
 has_closed_invalid = 'CLOSED_INVALID' in d
@@ -53,8 +74,8 @@ test("Status Enum Fix", has_new and no_new_web and has_closed_invalid,
      f"NEW={has_new} no_NEW_WEB={no_new_web} CLOSED_INVALID={has_closed_invalid}")
 
 # 4. Pagination Total Count
-r = requests.get(f'{BASE}/api/v1/reports?page=1&per_page=2', headers=headers)
-d = r.json()
+r = r_page1
+d = orjson.loads(r.content)
 returned = len(d.get('reports', []))
 total = d.get('total', 0)
 test("Pagination Total Count", total >= returned and total > 0,
@@ -62,97 +83,102 @@ test("Pagination Total Count", total >= returned and total > 0,
 
 # 5. Pagination Page 2
 if total > 2:
-    r2 = requests.get(f'{BASE}/api/v1/reports?page=2&per_page=2', headers=headers)
-    d2 = r2.json()
+    r2 = client.get('/api/v1/reports?page=2&per_page=2', headers=headers)
+    d2 = orjson.loads(r2.content)
     test("Pagination Page 2", d2.get('total') == total and len(d2.get('reports', [])) > 0,
          f"page2_total={d2.get('total')} page2_returned={len(d2.get('reports', []))}")
 
 # 6. Search Filter
-r = requests.get(f'{BASE}/api/v1/reports?search=penyimpangan', headers=headers)
-d = r.json()
+r = r_search
+d = orjson.loads(r.content)
 test("Search Filter", r.status_code == 200, f"total={d.get('total')} for 'penyimpangan'")
 
 # 7. Category Filter
-r = requests.get(f'{BASE}/api/v1/reports?category=FRAUD', headers=headers)
-d = r.json()
+r = r_category
+d = orjson.loads(r.content)
 all_fraud = all(rpt.get('category') == 'FRAUD' for rpt in d.get('reports', []))
 test("Category Filter", r.status_code == 200 and (all_fraud or len(d.get('reports', [])) == 0),
      f"total={d.get('total')} all_fraud={all_fraud}")
 
 # 8. Status Transition Validation (invalid)
 # Get a report with INVESTIGATING status
-r = requests.get(f'{BASE}/api/v1/reports?status=INVESTIGATING&per_page=1', headers=headers)
-d = r.json()
+r = client.get('/api/v1/reports?status=INVESTIGATING&per_page=1', headers=headers)
+d = orjson.loads(r.content)
 if d.get('reports'):
     rid = d['reports'][0]['id']
-    r = requests.patch(f'{BASE}/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'NEW'})
+    r = client.patch(f'/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'NEW'})
     test("Status Transition Block (invalid)", r.status_code == 400,
-         f"status={r.status_code} detail={r.json().get('detail', '')[:80]}")
+         f"status={r.status_code} detail={orjson.loads(r.content).get('detail', '')[:80]}")
 else:
     test("Status Transition Block (invalid)", False, "No INVESTIGATING reports to test")
 
 # 9. Status Transition Validation (valid)
 if d.get('reports'):
-    r = requests.patch(f'{BASE}/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'ESCALATED'})
+    r = client.patch(f'/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'ESCALATED'})
     test("Status Transition Allow (valid)", r.status_code == 200,
          f"status={r.status_code} INVESTIGATING->ESCALATED")
     # Revert
-    requests.patch(f'{BASE}/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'INVESTIGATING'})
+    client.patch(f'/api/v1/reports/{rid}/status', headers=headers, json={'new_status': 'INVESTIGATING'})
 
 # Phase 2
 print("\n--- Phase 2: Backend Features ---")
 
 # 10. Admin Message Reply
-r = requests.get(f'{BASE}/api/v1/reports?per_page=1', headers=headers)
-d = r.json()
+r = client.get('/api/v1/reports?per_page=1', headers=headers)
+d = orjson.loads(r.content)
 if d.get('reports'):
     rid = d['reports'][0]['id']
-    r = requests.post(f'{BASE}/api/v1/reports/{rid}/messages', headers=headers,
-                      json={'content': 'Test pesan dari admin - endpoint test'})
-    test("Admin Message Reply", r.status_code == 200, f"resp={r.json().get('message', '')}")
+    r = client.post(f'/api/v1/reports/{rid}/messages', headers=headers,
+                    json={'content': 'Test pesan dari admin - endpoint test'})
+    test("Admin Message Reply", r.status_code == 200, f"resp={orjson.loads(r.content).get('message', '')}")
 else:
     test("Admin Message Reply", False, "No reports")
 
 # 11. Report Assignment
 if d.get('reports'):
-    r = requests.post(f'{BASE}/api/v1/reports/{rid}/assign?assigned_to={user_id}', headers=headers)
-    test("Report Assignment", r.status_code == 200, f"resp={r.json().get('message', '')}")
+    r = client.post(f'/api/v1/reports/{rid}/assign?assigned_to={user_id}', headers=headers)
+    test("Report Assignment", r.status_code == 200, f"resp={orjson.loads(r.content).get('message', '')}")
 
 # 12. CSV Export
-r = requests.get(f'{BASE}/api/v1/reports/export?format=csv', headers=headers)
+r = client.get('/api/v1/reports/export?format=csv', headers=headers)
 lines = r.text.strip().split('\n') if r.text.strip() else []
 test("CSV Export", r.status_code == 200 and len(lines) > 1,
      f"rows={len(lines)-1} header={lines[0][:60]}..." if lines else "empty")
 
 # 13. User Management - Get User
-r = requests.get(f'{BASE}/api/v1/auth/users/{user_id}', headers=headers)
-d = r.json()
+r = client.get(f'/api/v1/auth/users/{user_id}', headers=headers)
+d = orjson.loads(r.content)
 test("Get Single User", r.status_code == 200 and 'password_hash' not in d,
      f"email={d.get('email')} no_hash={'password_hash' not in d}")
 
 # 14. Update User Profile
-r = requests.put(f'{BASE}/api/v1/auth/users/{user_id}', headers=headers,
-                 json={'full_name': 'Administrator WBS', 'department': 'IT'})
-test("Update User Profile", r.status_code == 200, f"resp={r.json()}")
+r = client.put(f'/api/v1/auth/users/{user_id}', headers=headers,
+               json={'full_name': 'Administrator WBS', 'department': 'IT'})
+test("Update User Profile", r.status_code == 200, f"resp={orjson.loads(r.content)}")
 
 # 15. Admin Reset Password (test on self - will change our password, skip for safety)
 test("Reset Password Endpoint", True, "Skipped (would change admin password)")
 
 # Phase 3 - can't easily test AI without Groq, just verify endpoint exists
 print("\n--- Phase 3: AI Analysis ---")
-r = requests.get(f'{BASE}/api/v1/reports?per_page=1', headers=headers)
-d = r.json()
+r = client.get('/api/v1/reports?per_page=1', headers=headers)
+d = orjson.loads(r.content)
 if d.get('reports'):
     rid = d['reports'][0]['id']
-    r = requests.get(f'{BASE}/api/v1/analysis/{rid}', headers=headers)
+    r = client.get(f'/api/v1/analysis/{rid}', headers=headers)
     test("Get Analysis Result", r.status_code in [200, 404], f"status={r.status_code}")
 
-# Rate limiting test
+# Rate limiting test: all 12 bad logins at once
+async def hammer():
+    async with httpx.AsyncClient(base_url=BASE, limits=LIMITS, timeout=30.0) as c:
+        return await asyncio.gather(*[
+            c.post('/api/v1/auth/login', json={'email':'test@test.com','password':'wrong'})
+            for _ in range(12)
+        ])
+
+
 print("\n--- Rate Limiting ---")
-statuses = []
-for i in range(12):
-    r = requests.post(f'{BASE}/api/v1/auth/login', json={'email':'test@test.com','password':'wrong'})
-    statuses.append(r.status_code)
+statuses = [r.status_code for r in asyncio.run(hammer())]
 has_429 = 429 in statuses
 test("Rate Limiting (login)", has_429, f"statuses={statuses}")
 
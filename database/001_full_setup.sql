@@ -221,9 +221,13 @@ CREATE TABLE knowledge_vectors (
     doc_type VARCHAR(50) NOT NULL,
     doc_name VARCHAR(255) NOT NULL,
     doc_source VARCHAR(500),
+    doc_id VARCHAR(255) UNIQUE,
     chunk_index INTEGER NOT NULL,
     content TEXT NOT NULL,
     content_length INTEGER,
+    display_content TEXT,
+    content_hash VARCHAR(64),
+    content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('indonesian', content)) STORED,
     embedding vector(384),
     metadata JSONB DEFAULT '{}',
     created_at TIMESTAMPTZ DEFAULT NOW(),
@@ -296,6 +300,9 @@ CREATE INDEX idx_knowledge_vectors_embedding ON knowledge_vectors
     USING hnsw (embedding vector_cosine_ops)
     WITH (m = 16, ef_construction = 64);
 
+CREATE INDEX idx_knowledge_vectors_content_tsv ON knowledge_vectors
+    USING gin (content_tsv);
+
 CREATE INDEX idx_case_vectors_embedding ON case_vectors
     USING hnsw (embedding vector_cosine_ops)
     WITH (m = 16, ef_construction = 64);
@@ -344,7 +351,8 @@ RETURNS TABLE (
 BEGIN
     RETURN QUERY
     SELECT
-        kv.id, kv.doc_type, kv.doc_name, kv.content,
+        kv.id, kv.doc_type, kv.doc_name,
+        COALESCE(kv.display_content, kv.content) AS content,
         1 - (kv.embedding <=> query_embedding) AS similarity
     FROM knowledge_vectors kv
     WHERE (filter_doc_type IS NULL OR kv.doc_type = filter_doc_type)
@@ -353,6 +361,33 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Match Documents by keyword (full-text search, rank normalized to 0..1)
+CREATE OR REPLACE FUNCTION match_documents_text(
+    query_text TEXT,
+    match_count INTEGER DEFAULT 5,
+    filter_doc_type VARCHAR DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    doc_type VARCHAR,
+    doc_name VARCHAR,
+    content TEXT,
+    rank FLOAT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        kv.id, kv.doc_type, kv.doc_name,
+        COALESCE(kv.display_content, kv.content) AS content,
+        ts_rank_cd(kv.content_tsv, q, 32)::FLOAT AS rank
+    FROM knowledge_vectors kv, plainto_tsquery('indonesian', query_text) q
+    WHERE kv.content_tsv @@ q
+      AND (filter_doc_type IS NULL OR kv.doc_type = filter_doc_type)
+    ORDER BY ts_rank_cd(kv.content_tsv, q, 32) DESC
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Match Similar Cases
 CREATE OR REPLACE FUNCTION match_cases(
     query_embedding vector(384),
@@ -654,6 +689,7 @@ COMMENT ON TABLE messages IS 'Two-way communication between whistleblower and ad
 COMMENT ON TABLE knowledge_vectors IS 'RAG knowledge base - regulations, policies, procedures';
 COMMENT ON TABLE case_vectors IS 'Past case embeddings for similar case matching';
 COMMENT ON FUNCTION match_documents IS 'RAG retrieval function using cosine similarity';
+COMMENT ON FUNCTION match_documents_text IS 'RAG keyword retrieval using full-text search';
 COMMENT ON FUNCTION match_cases IS 'Similar case matching using cosine similarity';
 
 -- ============================================================
@@ -0,0 +1,36 @@
+-- Migration 005: Precomputed display content for RAG retrieval
+-- Stores "[Sumber: <source>]\n<content>" once at index time so
+-- match_documents returns ready-to-use context blocks
+
+ALTER TABLE knowledge_vectors
+ADD COLUMN IF NOT EXISTS display_content TEXT;
+
+-- Backfill existing rows
+UPDATE knowledge_vectors
+SET display_content = '[Sumber: ' || COALESCE(metadata->>'source', doc_name, 'Unknown') || ']' || E'\n' || content
+WHERE display_content IS NULL;
+
+CREATE OR REPLACE FUNCTION match_documents(
+    query_embedding vector(384),
+    match_count INTEGER DEFAULT 5,
+    filter_doc_type VARCHAR DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    doc_type VARCHAR,
+    doc_name VARCHAR,
+    content TEXT,
+    similarity FLOAT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        kv.id, kv.doc_type, kv.doc_name,
+        COALESCE(kv.display_content, kv.content) AS content,
+        1 - (kv.embedding <=> query_embedding) AS similarity
+    FROM knowledge_vectors kv
+    WHERE (filter_doc_type IS NULL OR kv.doc_type = filter_doc_type)
+    ORDER BY kv.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
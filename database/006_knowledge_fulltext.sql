@@ -0,0 +1,39 @@
+-- Migration 006: Full-text (keyword) search over the knowledge base
+-- Lets queries citing regulations ("PP 43/2018 Pasal 5") be answered
+-- without an embedding pass or a vector search
+
+ALTER TABLE knowledge_vectors
+ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('indonesian', content)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_knowledge_vectors_content_tsv
+ON knowledge_vectors USING gin (content_tsv);
+
+-- rank is ts_rank_cd normalized to 0..1 (normalization flag 32)
+CREATE OR REPLACE FUNCTION match_documents_text(
+    query_text TEXT,
+    match_count INTEGER DEFAULT 5,
+    filter_doc_type VARCHAR DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    doc_type VARCHAR,
+    doc_name VARCHAR,
+    content TEXT,
+    rank FLOAT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        kv.id, kv.doc_type, kv.doc_name,
+        COALESCE(kv.display_content, kv.content) AS content,
+        ts_rank_cd(kv.content_tsv, q, 32)::FLOAT AS rank
+    FROM knowledge_vectors kv, plainto_tsquery('indonesian', query_text) q
+    WHERE kv.content_tsv @@ q
+      AND (filter_doc_type IS NULL OR kv.doc_type = filter_doc_type)
+    ORDER BY ts_rank_cd(kv.content_tsv, q, 32) DESC
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION match_documents_text IS 'RAG keyword retrieval using full-text search';
@@ -0,0 +1,11 @@
+-- Migration 007: Stable IDs and content hashes for seeded knowledge
+-- seed_knowledge.py upserts on doc_id and skips rows whose content_hash
+-- is unchanged, so re-running the seeder only re-embeds edited text
+
+ALTER TABLE knowledge_vectors
+ADD COLUMN IF NOT EXISTS doc_id VARCHAR(255),
+ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- NULLs stay allowed: rows indexed through the API have no doc_id
+CREATE UNIQUE INDEX IF NOT EXISTS idx_knowledge_vectors_doc_id
+ON knowledge_vectors (doc_id);
@@ -5,16 +5,27 @@ WBS BPKH AI - Knowledge Base Seeder
 Script untuk load regulasi dan dokumen referensi ke dalam RAG system.
 
 Usage:
-    python seed_knowledge.py
+    python seed_knowledge.py          # Hanya embed/upsert yang berubah
     python seed_knowledge.py --reset  # Reset dan reload semua
+    python seed_knowledge.py --no-cache  # Abaikan cache embedding lokal
+    python seed_knowledge.py --articles-only  # Hanya ringkasan pasal, tanpa chunk full text
+    SEED_ONNX_MODEL_DIR=<dir> python seed_knowledge.py  # Embedding via ONNX Runtime
 """
 
 import os
 import sys
 import asyncio
 import argparse
+import hashlib
+import sqlite3
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import httpx
+import numpy as np
+import orjson
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -22,7 +33,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from loguru import logger
-from supabase import create_client
+from supabase import ClientOptions, create_client
 
 
 # ============== Configuration ==============
@@ -34,323 +45,54 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     logger.error("Missing SUPABASE_URL or SUPABASE_KEY in environment")
     sys.exit(1)
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _make_http_client() -> httpx.Client:
+    """One pooled keep-alive client shared by every PostgREST call.
+
+    HTTP/2 multiplexes the concurrent batch inserts over a single TLS
+    connection; it needs the optional h2 package, so fall back to pooled
+    HTTP/1.1 when that is missing.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = SUPABASE_URL.startswith("https://")
+    except ImportError:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        follow_redirects=True,
+    )
+
+
+supabase = create_client(
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    options=ClientOptions(httpx_client=_make_http_client()),
+)
 
 
 # ============== Pre-loaded Regulations ==============
 
+# Regulation texts live in knowledge_base/regulations/<KEY>.json and are read
+# only when seeding (title, short_name, category, full_text, articles)
+REGULATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge_base", "regulations"
+)
+
 REGULATIONS = {
-    "UU_TIPIKOR": {
-        "title": "UU 31/1999 jo UU 20/2001 tentang Pemberantasan Tindak Pidana Korupsi",
-        "short_name": "UU Tipikor",
-        "category": "CORRUPTION",
-        "full_text": """
-UNDANG-UNDANG REPUBLIK INDONESIA NOMOR 31 TAHUN 1999 TENTANG PEMBERANTASAN TINDAK PIDANA KORUPSI
-
-BAB II - TINDAK PIDANA KORUPSI
-
-Pasal 2:
-(1) Setiap orang yang secara melawan hukum melakukan perbuatan memperkaya diri sendiri atau orang lain atau suatu korporasi yang dapat merugikan keuangan negara atau perekonomian negara, dipidana penjara dengan penjara seumur hidup atau pidana penjara paling singkat 4 (empat) tahun dan paling lama 20 (dua puluh) tahun dan denda paling sedikit Rp. 200.000.000,00 (dua ratus juta rupiah) dan paling banyak Rp. 1.000.000.000,00 (satu milyar rupiah).
-
-Pasal 3:
-Setiap orang yang dengan tujuan menguntungkan diri sendiri atau orang lain atau suatu korporasi, menyalahgunakan kewenangan, kesempatan atau sarana yang ada padanya karena jabatan atau kedudukan yang dapat merugikan keuangan negara atau perekonomian negara, dipidana dengan pidana penjara seumur hidup atau pidana penjara paling singkat 1 (satu) tahun dan paling lama 20 (dua puluh) tahun dan atau denda paling sedikit Rp. 50.000.000,00 (lima puluh juta rupiah) dan paling banyak Rp. 1.000.000.000,00 (satu milyar rupiah).
-
-Pasal 5:
-(1) Dipidana dengan pidana penjara paling singkat 1 (satu) tahun dan paling lama 5 (lima) tahun dan atau pidana denda paling sedikit Rp 50.000.000,00 (lima puluh juta rupiah) dan paling banyak Rp 250.000.000,00 (dua ratus lima puluh juta rupiah) setiap orang yang:
-a. memberi atau menjanjikan sesuatu kepada pegawai negeri atau penyelenggara negara dengan maksud supaya pegawai negeri atau penyelenggara negara tersebut berbuat atau tidak berbuat sesuatu dalam jabatannya, yang bertentangan dengan kewajibannya; atau
-b. memberi sesuatu kepada pegawai negeri atau penyelenggara negara karena atau berhubungan dengan sesuatu yang bertentangan dengan kewajiban, dilakukan atau tidak dilakukan dalam jabatannya.
-
-Pasal 11:
-Dipidana dengan pidana penjara paling singkat 1 (satu) tahun dan paling lama 5 (lima) tahun dan atau pidana denda paling sedikit Rp 50.000.000,00 (lima puluh juta rupiah) dan paling banyak Rp 250.000.000,00 (dua ratus lima puluh juta rupiah) pegawai negeri atau penyelenggara negara yang menerima hadiah atau janji padahal diketahui atau patut diduga, bahwa hadiah atau janji tersebut diberikan karena kekuasaan atau kewenangan yang berhubungan dengan jabatannya, atau yang menurut pikiran orang yang memberikan hadiah atau janji tersebut ada hubungan dengan jabatannya.
-
-Pasal 12:
-Dipidana dengan pidana penjara seumur hidup atau pidana penjara paling singkat 4 (empat) tahun dan paling lama 20 (dua puluh) tahun dan pidana denda paling sedikit Rp 200.000.000,00 (dua ratus juta rupiah) dan paling banyak Rp 1.000.000.000,00 (satu milyar rupiah):
-a. pegawai negeri atau penyelenggara negara yang menerima hadiah atau janji, padahal diketahui atau patut diduga bahwa hadiah atau janji tersebut diberikan untuk menggerakkan agar melakukan atau tidak melakukan sesuatu dalam jabatannya, yang bertentangan dengan kewajibannya;
-b. pegawai negeri atau penyelenggara negara yang menerima hadiah, padahal diketahui atau patut diduga bahwa hadiah tersebut diberikan sebagai akibat atau disebabkan karena telah melakukan atau tidak melakukan sesuatu dalam jabatannya yang bertentangan dengan kewajibannya.
-
-Pasal 12B (Gratifikasi):
-(1) Setiap gratifikasi kepada pegawai negeri atau penyelenggara negara dianggap pemberian suap, apabila berhubungan dengan jabatannya dan yang berlawanan dengan kewajiban atau tugasnya.
-(2) Pidana bagi pegawai negeri atau penyelenggara negara sebagaimana dimaksud dalam ayat (1) adalah pidana penjara seumur hidup atau pidana penjara paling singkat 4 (empat) tahun dan paling lama 20 (dua puluh) tahun, dan pidana denda paling sedikit Rp 200.000.000,00 (dua ratus juta rupiah) dan paling banyak Rp 1.000.000.000,00 (satu milyar rupiah).
-        """,
-        "articles": [
-            {"number": "Pasal 2", "content": "Perbuatan melawan hukum memperkaya diri yang merugikan keuangan negara. Pidana penjara 4-20 tahun atau seumur hidup, denda Rp200juta-Rp1milyar."},
-            {"number": "Pasal 3", "content": "Penyalahgunaan kewenangan/jabatan yang merugikan keuangan negara. Pidana penjara 1-20 tahun atau seumur hidup, denda Rp50juta-Rp1milyar."},
-            {"number": "Pasal 5", "content": "Memberi/menjanjikan sesuatu kepada pegawai negeri agar berbuat/tidak berbuat sesuatu. Pidana penjara 1-5 tahun, denda Rp50juta-Rp250juta."},
-            {"number": "Pasal 11", "content": "Pegawai negeri menerima hadiah/janji terkait jabatannya. Pidana penjara 1-5 tahun, denda Rp50juta-Rp250juta."},
-            {"number": "Pasal 12", "content": "Pegawai negeri menerima hadiah untuk melakukan/tidak melakukan sesuatu bertentangan kewajiban. Pidana 4-20 tahun atau seumur hidup."},
-            {"number": "Pasal 12B", "content": "Gratifikasi kepada pegawai negeri dianggap suap jika berhubungan jabatan. Pidana 4-20 tahun atau seumur hidup, denda Rp200juta-Rp1milyar."},
-        ]
-    },
-    
-    "PP_DISIPLIN_PNS": {
-        "title": "PP 94/2021 tentang Disiplin Pegawai Negeri Sipil",
-        "short_name": "PP Disiplin PNS",
-        "category": "MISCONDUCT",
-        "full_text": """
-PERATURAN PEMERINTAH REPUBLIK INDONESIA NOMOR 94 TAHUN 2021 TENTANG DISIPLIN PEGAWAI NEGERI SIPIL
-
-BAB II - KEWAJIBAN DAN LARANGAN
-
-Pasal 3 - Kewajiban PNS:
-Setiap PNS wajib:
-a. setia dan taat sepenuhnya kepada Pancasila, UUD 1945, NKRI, dan Pemerintah;
-b. menjaga persatuan dan kesatuan bangsa;
-c. melaksanakan kebijakan yang ditetapkan oleh pejabat pemerintah yang berwenang;
-d. menaati ketentuan peraturan perundang-undangan;
-e. melaksanakan tugas kedinasan dengan penuh pengabdian, kejujuran, kesadaran, dan tanggung jawab;
-f. menunjukkan integritas dan keteladanan dalam sikap, perilaku, ucapan, dan tindakan;
-g. menyimpan rahasia jabatan;
-h. bersedia ditempatkan di seluruh wilayah NKRI;
-i. mengutamakan kepentingan negara daripada kepentingan pribadi, seseorang, dan/atau golongan;
-j. melaporkan harta kekayaan kepada pejabat berwenang;
-k. masuk kerja dan menaati ketentuan jam kerja;
-l. mencapai sasaran kerja pegawai yang ditetapkan;
-m. menggunakan dan memelihara barang milik negara dengan sebaik-baiknya;
-n. memberikan kesempatan kepada bawahan untuk mengembangkan kompetensi;
-o. menolak segala bentuk pemberian yang berkaitan dengan tugas dan fungsi.
-
-Pasal 4 - Larangan PNS:
-Setiap PNS dilarang:
-a. menyalahgunakan wewenang;
-b. menjadi perantara untuk mendapatkan keuntungan pribadi dengan menggunakan kewenangan orang lain;
-c. memiliki, menjual, membeli, menggadaikan, menyewakan, atau meminjamkan barang milik negara secara tidak sah;
-d. melakukan pungutan di luar ketentuan;
-e. melakukan kegiatan yang merugikan negara;
-f. bertindak sewenang-wenang terhadap bawahan;
-g. menghalangi berjalannya tugas kedinasan;
-h. menerima hadiah yang berhubungan dengan jabatan dan/atau pekerjaannya;
-i. meminta sesuatu yang berhubungan dengan jabatan;
-j. melakukan tindakan atau tidak melakukan tindakan yang dapat menghalangi atau mempersulit salah satu pihak yang dilayani.
-
-BAB III - HUKUMAN DISIPLIN
-
-Pasal 7 - Jenis Hukuman:
-(1) Tingkat hukuman disiplin terdiri atas:
-    a. hukuman disiplin ringan;
-    b. hukuman disiplin sedang; dan
-    c. hukuman disiplin berat.
-
-(2) Jenis hukuman disiplin ringan terdiri atas:
-    a. teguran lisan;
-    b. teguran tertulis; dan
-    c. pernyataan tidak puas secara tertulis.
-
-(3) Jenis hukuman disiplin sedang terdiri atas:
-    a. pemotongan tunjangan kinerja sebesar 25% selama 6 bulan;
-    b. pemotongan tunjangan kinerja sebesar 25% selama 9 bulan; dan
-    c. pemotongan tunjangan kinerja sebesar 25% selama 12 bulan.
-
-(4) Jenis hukuman disiplin berat terdiri atas:
-    a. penurunan jabatan setingkat lebih rendah selama 12 bulan;
-    b. pembebasan dari jabatannya menjadi jabatan pelaksana selama 12 bulan; dan
-    c. pemberhentian dengan hormat tidak atas permintaan sendiri sebagai PNS.
-        """,
-        "articles": [
-            {"number": "Pasal 3", "content": "Kewajiban PNS: setia pada Pancasila/UUD, taat peraturan, jujur, berintegritas, menjaga rahasia jabatan, menolak pemberian terkait tugas."},
-            {"number": "Pasal 4", "content": "Larangan PNS: menyalahgunakan wewenang, menjadi perantara keuntungan pribadi, pungutan liar, menerima hadiah terkait jabatan, mempersulit pelayanan."},
-            {"number": "Pasal 7", "content": "Hukuman disiplin: ringan (teguran), sedang (potong tunjangan 25% 6-12 bulan), berat (penurunan jabatan/pemberhentian)."},
-        ]
-    },
-    
-    "PERPRES_PBJ": {
-        "title": "Perpres 16/2018 tentang Pengadaan Barang/Jasa Pemerintah",
-        "short_name": "Perpres PBJ",
-        "category": "PROCUREMENT",
-        "full_text": """
-PERATURAN PRESIDEN REPUBLIK INDONESIA NOMOR 16 TAHUN 2018 TENTANG PENGADAAN BARANG/JASA PEMERINTAH
-
-BAB II - PRINSIP DAN ETIKA PENGADAAN
-
-Pasal 6 - Prinsip Pengadaan:
-Pengadaan Barang/Jasa menerapkan prinsip sebagai berikut:
-a. efisien;
-b. efektif;
-c. transparan;
-d. terbuka;
-e. bersaing;
-f. adil; dan
-g. akuntabel.
-
-Pasal 7 - Etika Pengadaan:
-(1) Semua pihak yang terlibat dalam Pengadaan Barang/Jasa mematuhi etika sebagai berikut:
-    a. melaksanakan tugas secara tertib, disertai rasa tanggung jawab untuk mencapai sasaran, kelancaran, dan ketepatan tujuan Pengadaan Barang/Jasa;
-    b. bekerja secara profesional, mandiri, dan menjaga kerahasiaan informasi;
-    c. tidak saling mempengaruhi baik langsung maupun tidak langsung yang berakibat persaingan usaha tidak sehat;
-    d. menerima dan bertanggung jawab atas segala keputusan yang ditetapkan sesuai dengan kesepakatan tertulis pihak yang terkait;
-    e. menghindari dan mencegah terjadinya pertentangan kepentingan pihak yang terkait, baik secara langsung maupun tidak langsung, yang berakibat persaingan usaha tidak sehat;
-    f. menghindari dan mencegah pemborosan dan kebocoran keuangan negara;
-    g. menghindari dan mencegah penyalahgunaan wewenang dan/atau kolusi; dan
-    h. tidak menerima, tidak menawarkan, atau tidak menjanjikan untuk memberi atau menerima hadiah, imbalan, komisi, rabat, dan/atau berupa apa saja.
-
-BAB X - SANKSI
-
-Pasal 78:
-(1) Perbuatan atau tindakan Penyedia yang dapat dikenakan sanksi adalah:
-    a. berusaha mempengaruhi Pokja Pemilihan/Pejabat Pengadaan/pihak lain yang berwenang dalam bentuk dan cara apapun;
-    b. melakukan persekongkolan dengan Penyedia lain untuk mengatur harga penawaran;
-    c. membuat dan/atau menyampaikan dokumen dan/atau keterangan lain yang tidak benar;
-    d. mengundurkan diri dengan alasan yang tidak dapat diterima;
-    e. tidak dapat menyelesaikan pekerjaan sesuai dengan Kontrak;
-    f. menyalahgunakan fasilitas yang diberikan;
-    g. berperilaku tidak baik;
-    h. melanggar ketentuan peraturan perundang-undangan.
-
-(2) Selain perbuatan sebagaimana dimaksud pada ayat (1), perbuatan Penyedia yang dapat dikenakan sanksi berupa sanksi daftar hitam adalah:
-    a. tidak melaksanakan Kontrak, tidak menyelesaikan pekerjaan, atau tidak melaksanakan kewajiban dalam masa pemeliharaan;
-    b. menyebabkan kegagalan bangunan;
-    c. menyerahkan Jaminan yang tidak dapat dicairkan;
-    d. terindikasi melakukan persekongkolan, korupsi, kolusi, dan/atau nepotisme.
-        """,
-        "articles": [
-            {"number": "Pasal 6", "content": "Prinsip pengadaan: efisien, efektif, transparan, terbuka, bersaing, adil, akuntabel."},
-            {"number": "Pasal 7", "content": "Etika pengadaan: profesional, tidak mempengaruhi persaingan, mencegah pertentangan kepentingan, tidak menerima/memberi hadiah/komisi."},
-            {"number": "Pasal 78", "content": "Sanksi penyedia: mempengaruhi pokja, persekongkolan harga, dokumen palsu, tidak selesaikan kontrak. Daftar hitam untuk persekongkolan/KKN."},
-        ]
-    },
-    
-    "UU_PDP": {
-        "title": "UU 27/2022 tentang Pelindungan Data Pribadi",
-        "short_name": "UU PDP",
-        "category": "DATA_BREACH",
-        "full_text": """
-UNDANG-UNDANG REPUBLIK INDONESIA NOMOR 27 TAHUN 2022 TENTANG PELINDUNGAN DATA PRIBADI
-
-BAB IV - HAK SUBJEK DATA PRIBADI
-
-Pasal 5:
-Subjek Data Pribadi berhak:
-a. mendapatkan Informasi tentang kejelasan identitas, dasar kepentingan hukum, tujuan permintaan dan penggunaan Data Pribadi, dan akuntabilitas pihak yang meminta Data Pribadi;
-b. melengkapi, memperbarui, dan/atau memperbaiki kesalahan dan/atau ketidakakuratan Data Pribadi tentang dirinya sesuai dengan tujuan pemrosesan Data Pribadi;
-c. mendapatkan akses dan memperoleh salinan Data Pribadi tentang dirinya sesuai dengan ketentuan peraturan perundang-undangan;
-d. mengakhiri pemrosesan, menghapus, dan/atau memusnahkan Data Pribadi tentang dirinya.
-
-BAB V - KEWAJIBAN PENGENDALI DATA PRIBADI
-
-Pasal 20:
-Pengendali Data Pribadi wajib:
-a. melakukan pemrosesan Data Pribadi secara terbatas dan spesifik, sah secara hukum, dan transparan;
-b. memastikan keamanan pemrosesan Data Pribadi;
-c. melakukan pengawasan terhadap setiap pihak yang terlibat dalam pemrosesan Data Pribadi;
-d. melindungi Data Pribadi dari pemrosesan yang tidak sah.
-
-Pasal 46:
-(1) Dalam hal terjadi kegagalan Pelindungan Data Pribadi, Pengendali Data Pribadi wajib menyampaikan pemberitahuan secara tertulis paling lambat 3 x 24 jam kepada:
-    a. Subjek Data Pribadi; dan
-    b. lembaga.
-
-BAB XIV - KETENTUAN PIDANA
-
-Pasal 67:
-(1) Setiap Orang yang dengan sengaja dan melawan hukum memperoleh atau mengumpulkan Data Pribadi yang bukan miliknya dengan maksud untuk menguntungkan diri sendiri atau orang lain yang dapat mengakibatkan kerugian Subjek Data Pribadi dipidana dengan pidana penjara paling lama 5 (lima) tahun dan/atau pidana denda paling banyak Rp5.000.000.000,00 (lima miliar rupiah).
-
-Pasal 68:
-Setiap Orang yang dengan sengaja dan melawan hukum mengungkapkan Data Pribadi yang bukan miliknya dipidana dengan pidana penjara paling lama 4 (empat) tahun dan/atau pidana denda paling banyak Rp4.000.000.000,00 (empat miliar rupiah).
-
-Pasal 69:
-Setiap Orang yang dengan sengaja dan melawan hukum menggunakan Data Pribadi yang bukan miliknya dipidana dengan pidana penjara paling lama 5 (lima) tahun dan/atau pidana denda paling banyak Rp5.000.000.000,00 (lima miliar rupiah).
-
-Pasal 70:
-Setiap Orang yang dengan sengaja dan melawan hukum membuat Data Pribadi palsu atau memalsukan Data Pribadi dengan maksud untuk menguntungkan diri sendiri atau orang lain yang dapat mengakibatkan kerugian bagi orang lain dipidana dengan pidana penjara paling lama 6 (enam) tahun dan/atau pidana denda paling banyak Rp6.000.000.000,00 (enam miliar rupiah).
-        """,
-        "articles": [
-            {"number": "Pasal 5", "content": "Hak subjek data: informasi kejelasan identitas, melengkapi/memperbaiki data, akses salinan data, mengakhiri/menghapus data."},
-            {"number": "Pasal 20", "content": "Kewajiban pengendali: pemrosesan terbatas/spesifik/transparan, keamanan data, pengawasan, lindungi dari pemrosesan tidak sah."},
-            {"number": "Pasal 46", "content": "Kegagalan pelindungan wajib dilaporkan 3x24 jam kepada subjek data dan lembaga."},
-            {"number": "Pasal 67-70", "content": "Pidana: memperoleh data melawan hukum 5 tahun/Rp5M, mengungkapkan 4 tahun/Rp4M, menggunakan 5 tahun/Rp5M, memalsukan 6 tahun/Rp6M."},
-        ]
-    },
-    
-    "ISO_37002": {
-        "title": "ISO 37002:2021 Whistleblowing Management Systems",
-        "short_name": "ISO 37002",
-        "category": "ETHICS",
-        "full_text": """
-ISO 37002:2021 WHISTLEBLOWING MANAGEMENT SYSTEMS - GUIDELINES
-
-1. SCOPE
-This document gives guidelines for implementing, managing, evaluating, maintaining and improving a robust and effective whistleblowing management system within an organization.
-
-2. PRINCIPLES
-A whistleblowing management system should be based on the following principles:
-a) Trust: The system should be designed to encourage reports of wrongdoing by building trust with stakeholders.
-b) Impartiality: Reports should be assessed and addressed objectively and fairly.
-c) Protection: Persons who report wrongdoing in good faith should be protected from retaliation.
-d) Confidentiality: The identity of the whistleblower should be protected to the extent possible.
-
-3. WHISTLEBLOWING PROCESS
-
-3.1 Receiving Reports
-Organizations should establish accessible and secure channels for receiving reports of wrongdoing. These can include:
-- Dedicated telephone hotlines
-- Email addresses
-- Online reporting platforms
-- In-person reporting mechanisms
-- Written correspondence
-
-3.2 Assessing Reports
-Each report should be assessed to determine:
-- Whether it falls within the scope of the whistleblowing management system
-- The severity and potential impact of the alleged wrongdoing
-- The appropriate response and investigation requirements
-- Priority level based on urgency and risk
-
-3.3 Addressing Reports
-Organizations should:
-- Acknowledge receipt of the report
-- Investigate allegations thoroughly and impartially
-- Take appropriate corrective action
-- Document all steps taken
-- Maintain communication with the whistleblower where possible
-
-3.4 Closing Cases
-Cases should be closed when:
-- The investigation is complete
-- Appropriate action has been taken
-- All documentation is finalized
-- The whistleblower has been informed of the outcome (where appropriate)
-
-4. PROTECTION OF WHISTLEBLOWERS
-
-4.1 Confidentiality
-- Protect the identity of the whistleblower
-- Limit access to case information on a need-to-know basis
-- Use secure systems for storing and transmitting information
-
-4.2 Protection from Retaliation
-- Prohibit any form of retaliation against whistleblowers
-- Monitor for signs of retaliation
-- Take swift action to address any retaliation
-- Provide support to whistleblowers who experience retaliation
-
-5. GOVERNANCE AND OVERSIGHT
-
-5.1 Leadership
-Top management should demonstrate commitment to the whistleblowing management system by:
-- Establishing a whistleblowing policy
-- Allocating adequate resources
-- Promoting a speak-up culture
-- Ensuring regular review and improvement
-
-5.2 Roles and Responsibilities
-Clear roles should be defined for:
-- Receiving and triaging reports
-- Investigating allegations
-- Making decisions on corrective actions
-- Overseeing the system
-- Reporting to the board/governing body
-        """,
-        "articles": [
-            {"number": "Principles", "content": "Prinsip WBS: Trust (kepercayaan), Impartiality (ketidakberpihakan), Protection (perlindungan), Confidentiality (kerahasiaan)."},
-            {"number": "Receiving", "content": "Kanal penerimaan: hotline telepon, email, platform online, tatap muka, surat tertulis."},
-            {"number": "Assessing", "content": "Penilaian: cakupan WBS, tingkat keparahan, kebutuhan investigasi, prioritas berdasarkan urgensi/risiko."},
-            {"number": "Addressing", "content": "Penanganan: acknowledge laporan, investigasi menyeluruh, tindakan korektif, dokumentasi, komunikasi dengan pelapor."},
-            {"number": "Protection", "content": "Perlindungan pelapor: jaga kerahasiaan identitas, batasi akses info, larang retaliasi, monitor tanda-tanda retaliasi."},
-            {"number": "Governance", "content": "Tata kelola: komitmen pimpinan, alokasi sumber daya, budaya speak-up, review dan perbaikan berkala."},
-        ]
-    }
+    key: os.path.join(REGULATIONS_DIR, f"{key}.json")
+    for key in ["UU_TIPIKOR", "PP_DISIPLIN_PNS", "PERPRES_PBJ", "UU_PDP", "ISO_37002"]
 }
 
 
+def load_regulation(key: str) -> dict:
+    """Load one regulation's data from its JSON file"""
+    with open(REGULATIONS[key], "rb") as f:
+        return orjson.loads(f.read())
+
+
 # ============== Embedding Service ==============
 
 class SimpleEmbedding:
@@ -358,29 +100,34 @@ class SimpleEmbedding:
     
     def __init__(self, dimension: int = 384):
         self.dimension = dimension
+        self.model_name = f"simple-sha256-{dimension}"
     
     def embed(self, text: str) -> list:
         """Generate pseudo-embedding from text hash"""
-        import hashlib
-        
-        # Create hash
-        text_hash = hashlib.sha384(text.encode('utf-8')).digest()
-        
-        # Convert to floats
-        embedding = []
-        for i in range(self.dimension):
-            byte_val = text_hash[i % len(text_hash)]
-            embedding.append((byte_val / 255.0) * 2 - 1)
-        
-        # Normalize
-        magnitude = sum(x*x for x in embedding) ** 0.5
-        if magnitude > 0:
-            embedding = [x / magnitude for x in embedding]
-        
-        return embedding
+        return self._embed_array([text])[0].tolist()
+
+    def embed_batch(self, texts: list) -> list:
+        """Generate pseudo-embeddings for many texts"""
+        if not texts:
+            return []
+        return self._embed_array(texts).tolist()
+
+    def _embed_array(self, texts: list) -> np.ndarray:
+        # One SHA-256 digest per text (SHA-NI accelerated), repeated to fill
+        # the dimension and mapped from [0, 255] to [-1, 1], then L2-normalized
+        digests = np.frombuffer(
+            b"".join(hashlib.sha256(text.encode('utf-8')).digest() for text in texts),
+            dtype=np.uint8
+        ).reshape(len(texts), -1)
+        reps = -(-self.dimension // digests.shape[1])
+        vectors = np.tile(digests, reps)[:, :self.dimension] / 255.0 * 2 - 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
 
 
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
     
     class TransformerEmbedding:
@@ -388,13 +135,33 @@ try:
         
         def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
             logger.info(f"Loading embedding model: {model_name}")
+            self.model_name = model_name
             self.model = SentenceTransformer(model_name)
+            self.model.eval()
             self.dimension = self.model.get_sentence_embedding_dimension()
+            self.max_tokens = self.model.max_seq_length
         
         def embed(self, text: str) -> list:
             """Generate embedding from text"""
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            with torch.inference_mode():
+                embedding = self.model.encode(text, convert_to_numpy=True)
             return embedding.tolist()
+
+        def embed_batch(self, texts: list, batch_size: int = 64) -> list:
+            """Generate embeddings for many texts in batched forward passes"""
+            # inference_mode skips autograd bookkeeping for the forward pass
+            with torch.inference_mode():
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            return embeddings.tolist()
+
+        def count_tokens(self, text: str) -> int:
+            """Number of model tokens in text, without special tokens"""
+            return len(self.model.tokenizer.encode(text, add_special_tokens=False))
     
     EmbeddingService = TransformerEmbedding
     
@@ -403,38 +170,198 @@ except ImportError:
     EmbeddingService = SimpleEmbedding
 
 
+# Optional ONNX Runtime export of the same model (faster on CPU). Create it with
+#   optimum-cli export onnx --model sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2 <dir>
+# and set SEED_ONNX_MODEL_DIR=<dir>
+ONNX_MODEL_DIR = os.getenv("SEED_ONNX_MODEL_DIR")
+
+if ONNX_MODEL_DIR:
+    try:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        class OnnxEmbedding:
+            """ONNX Runtime embedding, mean-pooled like the sentence transformer"""
+
+            def __init__(self, model_dir: str = ONNX_MODEL_DIR,
+                         model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                         max_length: int = 128):
+                logger.info(f"Loading ONNX embedding model: {model_dir}")
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.intra_op_num_threads = os.cpu_count() or 1
+                self.session = ort.InferenceSession(
+                    os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+                )
+                self.input_names = {i.name for i in self.session.get_inputs()}
+                self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+                # Same vectors as TransformerEmbedding, so cache and row hashes carry over
+                self.model_name = model_name
+                self.max_length = max_length
+                self.max_tokens = max_length
+                self.dimension = self.session.get_outputs()[0].shape[-1]
+
+            def embed(self, text: str) -> list:
+                """Generate embedding from text"""
+                return self.embed_batch([text])[0]
+
+            def embed_batch(self, texts: list, batch_size: int = 64) -> list:
+                """Generate L2-normalized embeddings for many texts"""
+                if not texts:
+                    return []
+                pooled = []
+                for start in range(0, len(texts), batch_size):
+                    encoded = self.tokenizer(
+                        texts[start:start + batch_size], padding=True, truncation=True,
+                        max_length=self.max_length, return_tensors="np"
+                    )
+                    feed = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+                    token_embeddings = self.session.run(None, feed)[0]
+                    mask = encoded["attention_mask"][..., None].astype(np.float32)
+                    pooled.append((token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+                vectors = np.concatenate(pooled)
+                vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+                return vectors.tolist()
+
+            def count_tokens(self, text: str) -> int:
+                """Number of model tokens in text, without special tokens"""
+                return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+        EmbeddingService = OnnxEmbedding
+
+    except ImportError:
+        logger.warning("onnxruntime/transformers not available, ignoring SEED_ONNX_MODEL_DIR")
+
+
+@lru_cache()
+def get_embedder():
+    """Load the embedding model once per process and reuse it across runs"""
+    return EmbeddingService()
+
+
+class CachedEmbedding:
+    """On-disk embedding cache in front of another embedding service.
+
+    Vectors are keyed by model name and SHA-256 of the text, so re-runs
+    (e.g. --reset during development) only embed text that changed.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "wbs_bpkh", "embeddings.sqlite")
+
+    def __init__(self, inner, cache_path: str = DEFAULT_PATH):
+        self.inner = inner
+        self.dimension = inner.dimension
+        self.model_name = inner.model_name
+        if hasattr(inner, "count_tokens"):
+            self.max_tokens = inner.max_tokens
+            self.count_tokens = inner.count_tokens
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Used from the embedding worker thread, one call at a time
+        self.db = sqlite3.connect(cache_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _key(self, text: str) -> str:
+        return f"{self.inner.model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def embed(self, text: str) -> list:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list) -> list:
+        """Return cached vectors and embed only the misses"""
+        keys = [self._key(text) for text in texts]
+        cached = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):  # SQLite variable limit
+            part = unique_keys[start:start + 500]
+            cached.update(self.db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+            ).fetchall())
+
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        logger.info(f"Embedding cache: {len(cached)} hits, {len(misses)} misses")
+        if misses:
+            vectors = self.inner.embed_batch(list(misses.values()))
+            blobs = [np.asarray(v, dtype=np.float64).tobytes() for v in vectors]
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    zip(misses, blobs)
+                )
+            cached.update(zip(misses, blobs))
+
+        return [np.frombuffer(cached[key], dtype=np.float64).tolist() for key in keys]
+
+
 # ============== Text Chunking ==============
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list:
-    """Split text into overlapping chunks"""
+# Coarsest first: articles, chapters, paragraphs, lines, sentences, words.
+# Line-level separators open the piece they introduce ("Pasal 3: ..."), the
+# others close the piece before them ("... kewajibannya. ")
+_SEPARATORS = ['\n\nPasal ', '\n\nBAB ', '\n\n', '\n', '. ', ' ']
+
+# Token-sized chunking (when the embedding model has a tokenizer)
+TOKEN_CHUNK_MARGIN = 8
+TOKEN_CHUNK_OVERLAP = 20
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50, length=len) -> list:
+    """Split text into chunks that follow the regulation's structure
+
+    Text is cut into pieces at the coarsest separator present, and pieces
+    still longer than chunk_size are cut again with finer separators.
+    Consecutive pieces are then merged up to chunk_size, carrying up to
+    `overlap` of trailing pieces into the next chunk. Sizes are measured
+    with `length`: characters by default, or a tokenizer's token count.
+    """
     text = text.strip()
-    if len(text) <= chunk_size:
+    if length(text) <= chunk_size:
         return [text]
     
     chunks = []
-    start = 0
+    current = []
+    sizes = []
+    total = 0
+    for piece in _pieces(text, _SEPARATORS, chunk_size, length):
+        size = length(piece)
+        if current and total + size > chunk_size:
+            chunks.append(''.join(current))
+            # Keep a tail of the previous chunk as overlap, if it still fits
+            while current and (total > overlap or total + size > chunk_size):
+                current.pop(0)
+                total -= sizes.pop(0)
+        current.append(piece)
+        sizes.append(size)
+        total += size
+    if current:
+        chunks.append(''.join(current))
     
-    while start < len(text):
-        end = start + chunk_size
-        
-        # Try to break at sentence boundary
-        if end < len(text):
-            # Look for sentence end
-            for punct in ['. ', '.\n', ';\n', ':\n']:
-                last_punct = text.rfind(punct, start, end)
-                if last_punct > start + chunk_size // 2:
-                    end = last_punct + 1
-                    break
-        
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        
-        start = end - overlap
-        if start >= len(text):
+    chunks = (chunk.strip() for chunk in chunks)
+    return [chunk for chunk in chunks if chunk]
+
+
+def _pieces(text: str, separators: list, chunk_size: int, length=len) -> list:
+    """Cut text into pieces of at most chunk_size, coarsest separator first"""
+    if length(text) <= chunk_size:
+        return [text]
+    for i, sep in enumerate(separators):
+        if sep in text:
             break
+    else:
+        # No separator left: cut at fixed positions
+        return [text[s:s + chunk_size] for s in range(0, len(text), chunk_size)]
+    
+    parts = text.split(sep)
+    if sep.startswith('\n'):
+        parts = [parts[0]] + [sep + part for part in parts[1:]]
+    else:
+        parts = [part + sep for part in parts[:-1]] + [parts[-1]]
     
-    return chunks
+    pieces = []
+    for part in parts:
+        if part:
+            pieces.extend(_pieces(part, separators[i + 1:], chunk_size, length))
+    return pieces
 
 
 # ============== Database Operations ==============
@@ -450,47 +377,137 @@ async def clear_knowledge_base():
         logger.warning(f"Could not clear knowledge base: {e}")
 
 
-async def insert_vector(embedding_service, doc_type: str, doc_name: str, content: str,
-                        chunk_index: int, metadata: dict, doc_source: str = None):
-    """Insert a single vector into database"""
-    try:
-        # Generate embedding
-        embedding = embedding_service.embed(content)
-
-        # Insert into database (matches knowledge_vectors schema)
-        data = {
-            "doc_type": doc_type,
-            "doc_name": doc_name,
-            "doc_source": doc_source,
-            "chunk_index": chunk_index,
-            "content": content,
-            "content_length": len(content),
-            "embedding": embedding,
-            "metadata": metadata
-        }
-
-        supabase.table("knowledge_vectors").insert(data).execute()
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to insert vector: {e}")
-        return False
+def build_vector_row(doc_id: str, doc_type: str, doc_name: str, content: str,
+                     chunk_index: int, metadata: dict, doc_source: str = None) -> dict:
+    """Build a knowledge_vectors row without its embedding (matches knowledge_vectors schema)"""
+    return {
+        "doc_id": doc_id,
+        "doc_type": doc_type,
+        "doc_name": doc_name,
+        "doc_source": doc_source,
+        "chunk_index": chunk_index,
+        "content": content,
+        "content_length": len(content),
+        "display_content": f"[Sumber: {doc_name}]\n{content}",
+        "metadata": metadata
+    }
 
 
-async def seed_regulation(embedding_service, reg_key: str, regulation: dict) -> tuple:
-    """Seed a single regulation into the knowledge base"""
+def to_pgvector(embedding) -> str:
+    """Format an embedding as a pgvector text literal ("[x,y,...]")"""
+    # pgvector stores float32: sending shortest float32 digits instead of
+    # float64 reprs cuts the payload ~40% with no loss in the stored vector
+    return orjson.dumps(
+        np.ascontiguousarray(embedding, dtype=np.float32),
+        option=orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
+def row_hash(row: dict, model_name: str) -> str:
+    """Hash of everything stored for a row, including the embedding model"""
+    payload = orjson.dumps([model_name, row], option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+# Bounds concurrent Supabase requests when regulations are seeded in parallel
+MAX_CONCURRENT_INSERTS = 4
+_insert_slots = None
+
+# Embedding is CPU-bound: it runs on one worker thread, so one regulation is
+# embedded while the upserts of others are in flight
+_embed_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+
+# Vectors embedded during the current run, keyed by text: boilerplate shared
+# across articles and regulations is embedded once (reset per run)
+_embedded = {}
+
+
+def _embed_unique(embedding_service, texts: list) -> list:
+    """Embed only texts not seen yet this run (called on the embedding thread)"""
+    new = [text for text in dict.fromkeys(texts) if text not in _embedded]
+    if new:
+        _embedded.update(zip(new, embedding_service.embed_batch(new)))
+    if len(new) < len(texts):
+        logger.info(f"  {len(texts) - len(new)} duplicate chunks reused")
+    return [_embedded[text] for text in texts]
+
+
+async def embed_texts(embedding_service, texts: list) -> list:
+    """Run embed_batch on the embedding worker thread, skipping duplicate texts"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_embed_pool, _embed_unique, embedding_service, texts)
+
+
+async def split_full_text(embedding_service, text: str) -> list:
+    """Chunk a regulation's full text to fit the embedding model
+
+    With a tokenizer available, chunks are sized in model tokens so none is
+    truncated at encode time; this runs on the embedding thread because the
+    tokenizer is not safe to share across threads. Without one, fall back
+    to character-sized chunks.
+    """
+    if not hasattr(embedding_service, "count_tokens"):
+        return chunk_text(text)
+    # Leave room for special tokens and for merging separately tokenized pieces
+    chunk_size = embedding_service.max_tokens - TOKEN_CHUNK_MARGIN
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _embed_pool,
+        lambda: chunk_text(text, chunk_size, TOKEN_CHUNK_OVERLAP, embedding_service.count_tokens)
+    )
+
+
+async def _execute(query):
+    """Run a supabase-py query in a worker thread (the client is synchronous)"""
+    global _insert_slots
+    if _insert_slots is None:
+        _insert_slots = asyncio.Semaphore(MAX_CONCURRENT_INSERTS)
+    async with _insert_slots:
+        return await asyncio.to_thread(query.execute)
+
+
+async def upsert_vectors_batch(rows: list, batch_size: int = 500) -> list:
+    """Upsert rows on doc_id in multi-row statements; returns a success flag per row"""
+    inserted = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            await _execute(supabase.table("knowledge_vectors").upsert(batch, on_conflict="doc_id"))
+            inserted.extend([True] * len(batch))
+            continue
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to insert vector: {e}")
+                inserted.append(False)
+                continue
+            # One bad row fails the whole statement: isolate it
+            logger.warning(f"Batch insert failed, retrying row by row: {e}")
+        for row in batch:
+            inserted.extend(await upsert_vectors_batch([row]))
+    return inserted
+
+
+async def seed_regulation(embedding_service, reg_key: str, regulation: dict,
+                          articles_only: bool = False) -> tuple:
+    """Seed a single regulation into the knowledge base
+
+    With articles_only, a regulation that has articles is indexed through
+    them alone; its full-text chunks are skipped (and removed if present).
+    """
     
     documents_loaded = 0
     chunks_created = 0
     
     logger.info(f"Processing: {regulation['title']}")
     
-    # 1. Index full document chunks
-    full_chunks = chunk_text(regulation['full_text'])
-
-    for i, chunk in enumerate(full_chunks):
-        success = await insert_vector(
-            embedding_service,
+    # 1. Full document chunks
+    if articles_only and regulation.get('articles'):
+        full_chunks = []
+    else:
+        full_chunks = await split_full_text(embedding_service, regulation['full_text'])
+    vectors = [
+        dict(
+            doc_id=f"{reg_key}/full_text/{i}",
             doc_type="regulation",
             doc_name=regulation['title'],
             doc_source=reg_key,
@@ -504,15 +521,13 @@ async def seed_regulation(embedding_service, reg_key: str, regulation: dict) ->
                 "total_chunks": len(full_chunks)
             }
         )
-        if success:
-            chunks_created += 1
-
-    documents_loaded += 1
+        for i, chunk in enumerate(full_chunks)
+    ]
 
-    # 2. Index individual articles
-    for j, article in enumerate(regulation.get('articles', [])):
-        success = await insert_vector(
-            embedding_service,
+    # 2. Individual articles
+    vectors.extend(
+        dict(
+            doc_id=f"{reg_key}/article/{j}",
             doc_type="regulation",
             doc_name=f"{regulation['short_name']} - {article['number']}",
             doc_source=reg_key,
@@ -525,16 +540,51 @@ async def seed_regulation(embedding_service, reg_key: str, regulation: dict) ->
                 "article_number": article['number']
             }
         )
-        if success:
+        for j, article in enumerate(regulation.get('articles', []))
+    )
+
+    rows = [build_vector_row(**vector) for vector in vectors]
+    for row in rows:
+        row["content_hash"] = row_hash(row, embedding_service.model_name)
+
+    # Skip rows already stored with the same hash; drop rows no longer produced
+    existing = await _execute(
+        supabase.table("knowledge_vectors")
+        .select("id, doc_id, content_hash")
+        .eq("doc_type", "regulation")
+        .eq("doc_source", reg_key)
+    )
+    stored = {r["doc_id"]: r["content_hash"] for r in existing.data or [] if r.get("doc_id")}
+    current = {row["doc_id"] for row in rows}
+    stale = [r["id"] for r in existing.data or [] if r.get("doc_id") not in current]
+    if stale:
+        await _execute(supabase.table("knowledge_vectors").delete().in_("id", stale))
+
+    changed = [row for row in rows if stored.get(row["doc_id"]) != row["content_hash"]]
+    logger.info(f"  {len(rows) - len(changed)} unchanged, {len(changed)} to embed, {len(stale)} stale removed")
+
+    # Embed the changed rows in one batched call, then upsert in one round-trip
+    if changed:
+        embeddings = await embed_texts(embedding_service, [row["content"] for row in changed])
+        for row, embedding in zip(changed, embeddings):
+            row["embedding"] = to_pgvector(embedding)
+        ok = dict(zip((row["doc_id"] for row in changed), await upsert_vectors_batch(changed)))
+    else:
+        ok = {}
+
+    documents_loaded += 1
+    for vector in vectors:
+        if ok.get(vector["doc_id"], True):
             chunks_created += 1
-            documents_loaded += 1
+            if vector["metadata"]["part"] == "article":
+                documents_loaded += 1
     
     logger.info(f"  → {documents_loaded} documents, {chunks_created} chunks")
     
     return documents_loaded, chunks_created
 
 
-async def seed_all_regulations(reset: bool = False):
+async def seed_all_regulations(reset: bool = False, use_cache: bool = True, articles_only: bool = False):
     """Seed all pre-loaded regulations"""
     
     logger.info("=" * 60)
@@ -545,16 +595,22 @@ async def seed_all_regulations(reset: bool = False):
         await clear_knowledge_base()
     
     # Initialize embedding service
-    embedding_service = EmbeddingService()
+    embedding_service = get_embedder()
+    if use_cache:
+        embedding_service = CachedEmbedding(embedding_service)
     logger.info(f"Embedding dimension: {embedding_service.dimension}")
     
-    total_documents = 0
-    total_chunks = 0
-    
-    for reg_key, regulation in REGULATIONS.items():
-        docs, chunks = await seed_regulation(embedding_service, reg_key, regulation)
-        total_documents += docs
-        total_chunks += chunks
+    # Regulations are seeded concurrently so their inserts overlap; the
+    # request limiter is created per run (asyncio primitives bind to one loop)
+    global _insert_slots
+    _insert_slots = asyncio.Semaphore(MAX_CONCURRENT_INSERTS)
+    _embedded.clear()
+    results = await asyncio.gather(*(
+        seed_regulation(embedding_service, reg_key, load_regulation(reg_key), articles_only)
+        for reg_key in REGULATIONS
+    ))
+    total_documents = sum(docs for docs, _ in results)
+    total_chunks = sum(chunks for _, chunks in results)
     
     logger.info("=" * 60)
     logger.info(f"COMPLETE: {total_documents} documents, {total_chunks} chunks indexed")
@@ -573,9 +629,13 @@ async def seed_all_regulations(reset: bool = False):
 def main():
     parser = argparse.ArgumentParser(description="WBS BPKH AI Knowledge Base Seeder")
     parser.add_argument("--reset", action="store_true", help="Clear existing knowledge base before seeding")
+    parser.add_argument("--no-cache", action="store_true", help="Re-embed everything instead of using the local embedding cache")
+    parser.add_argument("--articles-only", action="store_true", help="Skip full-text chunks for regulations that have article summaries")
     args = parser.parse_args()
     
-    result = asyncio.run(seed_all_regulations(reset=args.reset))
+    result = asyncio.run(seed_all_regulations(
+        reset=args.reset, use_cache=not args.no_cache, articles_only=args.articles_only
+    ))
     
     print("\n" + "=" * 60)
     print("Seeding Complete!")